@@ -0,0 +1,520 @@
+import os
+import sys
+import json
+import asyncio
+import hashlib
+import argparse
+from urllib.parse import urlsplit, parse_qsl
+
+from ticket_filter import TicketFilter
+from ticket_service import TicketService
+from ticket_storage import plain_values
+
+# Serveur HTTP/JSON local au-dessus d'un TicketService, pour les scripts et pour
+# plusieurs clients à la fois (dont la fenêtre principale avec "storage": "http") :
+# - les lectures sont servies depuis le DataFrame en mémoire, par une seule boucle
+#   asyncio : tous les clients sont servis en parallèle, sans verrou ;
+# - les écritures passent par une file consommée par une seule tâche : elles sont
+#   appliquées une à une, puis confirmées une fois écrites sur disque (une seule
+#   écriture pour toutes les modifications arrivées entre-temps) ;
+# - chaque ticket a un ETag (empreinte de ses valeurs) : If-None-Match évite de
+#   renvoyer un ticket ou une liste inchangés, If-Match refuse (412) une modification
+#   faite à partir d'une version périmée.
+#
+#   python api_server.py --port 8765
+#
+#   GET    /config                   listes de valeurs de config.json
+#   GET    /tickets?statut=Ouvert&nom=dupont&offset=0&limit=100
+#   GET    /tickets/<n°>
+#   POST   /tickets                  création (numéro attribué par le serveur)
+#   PUT    /tickets/<n°>             remplacement (ou création avec ce numéro)
+#   PATCH  /tickets/<n°>             modification des seuls champs fournis
+#   DELETE /tickets/<n°>
+#   POST   /tickets/batch            {"upserts": [tickets], "deletes": [numéros]}
+#   PUT    /tickets                  remplacement de l'ensemble des tickets
+#   POST   /numbers                  {"count": n} : réserve n numéros consécutifs
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10000
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_HEADERS = 100
+# Intervalle (s) entre deux vérifications des modifications faites directement dans
+# le fichier (postes qui n'utilisent pas le serveur)
+SYNC_INTERVAL = 5.0
+
+# Noms sans accents acceptés dans les paramètres et le JSON, en plus des noms de colonnes
+ALIASES = {
+    "numero": "N°", "nom": "Nom", "programme": "Programme",
+    "description": "Description", "statut": "Statut", "priorite": "Priorité"
+}
+
+REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified",
+    400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+    412: "Precondition Failed", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def ticket_etag(columns, ticket):
+    # Empreinte des valeurs du ticket : identique d'un redémarrage à l'autre
+    values = plain_values(columns, [ticket.get(col) for col in columns])
+    digest = hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def etag_matches(header, etag):
+    # Vrai si l'en-tête If-Match / If-None-Match contient l'ETag (ou "*")
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class TicketApiServer:
+    def __init__(self, ticket_service, sync_interval=SYNC_INTERVAL):
+        self.ticket_service = ticket_service
+        self.columns = ticket_service.columns
+        self.sync_interval = sync_interval
+        # Mêmes règles de filtrage que les filtres de la fenêtre principale
+        self.ticket_filter = TicketFilter(ticket_service, exact_columns=ticket_service.schema.category_columns)
+        # Identifie cette exécution du serveur dans l'ETag de la collection (le compteur
+        # "version" du service repart de zéro à chaque démarrage)
+        self.instance = os.urandom(4).hex()
+        self._queue = None
+        self._writer_task = None
+        self._server = None
+
+    @property
+    def collection_etag(self):
+        return f'"{self.instance}-{self.ticket_service.version}"'
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # Renvoie le port d'écoute (utile avec port=0)
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._run_writer())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._writer_task.cancel()
+
+    # -- Écritures : une seule tâche, confirmées après écriture sur disque --
+
+    async def submit(self, operation, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, args, future))
+        return await future
+
+    async def _run_writer(self):
+        loop = asyncio.get_running_loop()
+        service = self.ticket_service
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), self.sync_interval)
+            except asyncio.TimeoutError:
+                self._sync()
+                continue
+            batch = [item]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Les conditions If-Match sont vérifiées sur l'état le plus récent du fichier
+            self._sync()
+            results = []
+            for operation, args, future in batch:
+                try:
+                    results.append((future, operation(*args), None))
+                except Exception as e:
+                    results.append((future, None, e))
+            # Une seule écriture pour tout le lot, faite hors de la boucle : les lectures
+            # continuent d'être servies pendant ce temps
+            await loop.run_in_executor(None, service.writer.flush)
+            failed = service.save_state() == "error"
+            for future, result, error in results:
+                if future.cancelled():
+                    continue
+                if error is None and failed:
+                    error = ApiError(500, f"Modification non enregistrée sur disque : {service.writer.last_error}")
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            if service.storage.external_changes:
+                # L'écriture a fusionné des modifications faites directement dans le fichier
+                self._sync()
+
+    def _sync(self):
+        # config.json modifié : listes de valeurs autorisées relues
+        self.ticket_service.registry.reload()
+        try:
+            self.ticket_service.sync_from_disk()
+        except Exception as e:
+            print("Erreur lors de la relecture du fichier :", e, file=sys.stderr)
+
+    # -- Protocole HTTP --
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    self._write_response(writer, e.status, e.headers, {"error": str(e)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+                status, response_headers, payload = await self._dispatch(method, target, headers, body)
+                self._write_response(writer, status, response_headers, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        # (méthode, cible, en-têtes en minuscules, corps, connexion persistante),
+        # ou None à la fermeture de la connexion par le client
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                raise ApiError(400, "Requête invalide.")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+                if len(headers) > MAX_HEADERS:
+                    raise ApiError(400, "Trop d'en-têtes.")
+        except ValueError:
+            # Ligne plus longue que la limite du StreamReader
+            raise ApiError(400, "Requête invalide.")
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise ApiError(411, "Content-Length requis.")
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise ApiError(400, "Content-Length invalide.")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Corps de la requête trop volumineux.")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), target, headers, body, keep_alive
+
+    def _write_response(self, writer, status, headers, payload, keep_alive):
+        headers = dict(headers)
+        body = b""
+        if status not in (204, 304):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+            headers["Content-Length"] = str(len(body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _dispatch(self, method, target, headers, body):
+        # Renvoie (statut, en-têtes, contenu JSON)
+        try:
+            url = urlsplit(target)
+            parts = [part for part in url.path.split("/") if part]
+            params = parse_qsl(url.query, keep_blank_values=True)
+            data = self._parse_body(body)
+            if parts == ["config"]:
+                allowed = "GET"
+                if method == "GET":
+                    return self.get_config()
+            elif parts == ["tickets"]:
+                allowed = "GET, POST, PUT"
+                if method == "GET":
+                    return self.list_tickets(params, headers)
+                if method == "POST":
+                    return await self.submit(self.create_ticket, data)
+                if method == "PUT":
+                    return await self.submit(self.replace_all, data)
+            elif parts == ["tickets", "batch"]:
+                allowed = "POST"
+                if method == "POST":
+                    return await self.submit(self.apply_batch, data)
+            elif parts == ["numbers"]:
+                allowed = "POST"
+                if method == "POST":
+                    return await self.submit(self.allocate_numbers, data)
+            elif len(parts) == 2 and parts[0] == "tickets":
+                allowed = "GET, PUT, PATCH, DELETE"
+                number = self._ticket_number(parts[1])
+                if method == "GET":
+                    return self.get_ticket(number, headers)
+                if method == "PUT":
+                    return await self.submit(self.put_ticket, number, data, headers.get("if-match"))
+                if method == "PATCH":
+                    return await self.submit(self.patch_ticket, number, data, headers.get("if-match"))
+                if method == "DELETE":
+                    return await self.submit(self.delete_ticket, number, headers.get("if-match"))
+            elif len(parts) == 3 and parts[0] == "tickets" and parts[2] == "history":
+                allowed = "GET"
+                number = self._ticket_number(parts[1])
+                if method == "GET":
+                    return await self.get_history(number)
+            else:
+                raise ApiError(404, "Ressource inconnue.")
+            raise ApiError(405, f"Méthode {method} non autorisée.", {"Allow": allowed})
+        except ApiError as e:
+            return e.status, e.headers, {"error": str(e)}
+        except Exception as e:
+            print("Erreur lors du traitement de la requête :", e, file=sys.stderr)
+            return 500, {}, {"error": str(e)}
+
+    # -- Lectures (servies directement, sans passer par la file d'écriture) --
+
+    def get_config(self):
+        schema = self.ticket_service.schema
+        return 200, {}, {
+            "columns": self.columns,
+            "programmes": schema.allowed_values("Programme"),
+            "statuts": schema.allowed_values("Statut"),
+            "priorites": schema.allowed_values("Priorité"),
+            "archive_status": self.ticket_service.archived_status
+        }
+
+    def list_tickets(self, params, headers):
+        etag = self.collection_etag
+        if etag_matches(headers.get("if-none-match"), etag):
+            return 304, {"ETag": etag}, None
+        offset, limit, criteria = 0, DEFAULT_PAGE_SIZE, {}
+        for name, value in params:
+            if name in ("offset", "limit"):
+                try:
+                    number = int(value)
+                except ValueError:
+                    number = -1
+                if number < 0:
+                    raise ApiError(400, f"Paramètre {name} invalide : {value}")
+                if name == "offset":
+                    offset = number
+                else:
+                    limit = min(number, MAX_PAGE_SIZE)
+            else:
+                criteria[self._column(name)] = value
+        positions = self.ticket_filter.filter(criteria)
+        page = positions[offset:offset + limit]
+        rows = self.ticket_service.df[self.columns].iloc[page].to_numpy(dtype=object)
+        tickets = [dict(zip(self.columns, plain_values(self.columns, row))) for row in rows]
+        return 200, {"ETag": etag}, {"total": len(positions), "offset": offset, "limit": limit, "tickets": tickets}
+
+    def get_ticket(self, number, headers):
+        ticket = self._existing(number)
+        etag = ticket_etag(self.columns, ticket)
+        if etag_matches(headers.get("if-none-match"), etag):
+            return 304, {"ETag": etag}, None
+        return 200, {"ETag": etag}, self._plain(ticket)
+
+    async def get_history(self, number):
+        # Lecture des fichiers du journal hors de la boucle (voir "journal" dans config.json)
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, self.ticket_service.ticket_history, number)
+        if not entries:
+            self._existing(number)
+        return 200, {}, {"N°": number, "history": entries}
+
+    # -- Écritures (exécutées par la tâche d'écriture, voir submit) --
+
+    def create_ticket(self, data):
+        number = self.ticket_service.add_tickets([self._values(data, partial=False)])[0]
+        return self._ticket_response(201, number, {"Location": f"/tickets/{number}"})
+
+    def put_ticket(self, number, data, if_match):
+        current = self.ticket_service.get_ticket(number)
+        self._check_precondition(if_match, current)
+        ticket = {"N°": number}
+        ticket.update(self._values(data, partial=False))
+        self.ticket_service.put_tickets([ticket])
+        return self._ticket_response(200 if current is not None else 201, number)
+
+    def patch_ticket(self, number, data, if_match):
+        current = self._existing(number)
+        self._check_precondition(if_match, current)
+        self.ticket_service.update_tickets({number: self._values(data, partial=True)})
+        return self._ticket_response(200, number)
+
+    def delete_ticket(self, number, if_match):
+        current = self._existing(number)
+        self._check_precondition(if_match, current)
+        self.ticket_service.delete_tickets([number])
+        return 204, {}, None
+
+    def apply_batch(self, data):
+        # Écritures d'un client utilisant le serveur comme stockage (ticket_storage.HttpStorage)
+        if not isinstance(data, dict):
+            raise ApiError(400, "Objet JSON attendu.")
+        upserts = [self._full_ticket(record) for record in data.get("upserts") or []]
+        deletes = [self._ticket_number(number) for number in data.get("deletes") or []]
+        return self._write_tickets(upserts, deletes)
+
+    def replace_all(self, data):
+        if not isinstance(data, list):
+            raise ApiError(400, "Liste de tickets attendue.")
+        tickets = [self._full_ticket(record) for record in data]
+        kept = {ticket["N°"] for ticket in tickets}
+        deletes = [number for number in self.ticket_service.df["N°"].dropna().tolist() if number not in kept]
+        return self._write_tickets(tickets, deletes)
+
+    def allocate_numbers(self, data):
+        if data is None:
+            data = {}
+        count = data.get("count", 1) if isinstance(data, dict) else None
+        if not isinstance(count, int) or count < 1:
+            raise ApiError(400, "Nombre de numéros invalide.")
+        return 200, {}, {"first": self.ticket_service.next_ticket_number(count)}
+
+    def _write_tickets(self, upserts, deletes):
+        # previous_etag permet au client de savoir si un autre client a écrit entre-temps
+        previous = self.collection_etag
+        if deletes:
+            self.ticket_service.delete_tickets(deletes)
+        self.ticket_service.put_tickets(upserts)
+        return 200, {}, {
+            "upserts": len(upserts), "deletes": len(deletes),
+            "previous_etag": previous, "etag": self.collection_etag
+        }
+
+    # -- Outils internes --
+
+    def _parse_body(self, body):
+        if not body:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise ApiError(400, "Corps JSON invalide.")
+
+    def _column(self, name):
+        column = ALIASES.get(name, name)
+        if column not in self.columns:
+            raise ApiError(400, f"Champ inconnu : {name}")
+        return column
+
+    def _ticket_number(self, value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ApiError(404, f"Numéro de ticket invalide : {value}")
+
+    def _existing(self, number):
+        ticket = self.ticket_service.get_ticket(number)
+        if ticket is None:
+            raise ApiError(404, f"Le ticket {number} n'existe pas.")
+        return ticket
+
+    def _check_precondition(self, if_match, current):
+        if if_match is None:
+            return
+        if current is None or not etag_matches(if_match, ticket_etag(self.columns, current)):
+            raise ApiError(412, "Le ticket a été modifié entre-temps.")
+
+    def _values(self, data, partial):
+        # Champs d'un ticket saisi par un client, contrôlés comme dans la fenêtre
+        # "Nouveau Ticket" : valeurs des listes de config.json, Nom et Description requis
+        if not isinstance(data, dict):
+            raise ApiError(400, "Objet JSON attendu.")
+        values = {}
+        for name, value in data.items():
+            column = self._column(name)
+            if column == "N°":
+                # Numéro pris dans l'URL ou attribué par le serveur
+                continue
+            if value is not None and not isinstance(value, str):
+                raise ApiError(400, f"Texte attendu pour {column}.")
+            values[column] = (value or "").strip()
+        schema = self.ticket_service.schema
+        if not partial:
+            for column in schema.category_columns:
+                if column not in values:
+                    allowed = schema.allowed_values(column)
+                    values[column] = allowed[0] if allowed else ""
+        error = schema.check(values, partial)
+        if error is not None:
+            raise ApiError(400, error)
+        return values
+
+    def _full_ticket(self, record):
+        # Ticket complet (numéro compris), enregistré tel quel
+        if not isinstance(record, dict):
+            raise ApiError(400, "Objet JSON attendu.")
+        ticket = {col: None for col in self.columns}
+        for name, value in record.items():
+            column = self._column(name)
+            if column != "N°" and value is not None and not isinstance(value, str):
+                raise ApiError(400, f"Texte attendu pour {column}.")
+            ticket[column] = value
+        ticket["N°"] = self._ticket_number(ticket["N°"])
+        return ticket
+
+    def _plain(self, ticket):
+        return dict(zip(self.columns, plain_values(self.columns, [ticket.get(col) for col in self.columns])))
+
+    def _ticket_response(self, status, number, headers=None):
+        ticket = self._existing(number)
+        headers = dict(headers or {}, ETag=ticket_etag(self.columns, ticket))
+        return status, headers, self._plain(ticket)
+
+
+async def run(server, host, port):
+    port = await server.start(host, port)
+    print(f"Serveur d'API à l'écoute sur http://{host}:{port}", file=sys.stderr)
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur HTTP/JSON d'accès aux tickets")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--config", default="config.json", help="fichier de configuration")
+    parser.add_argument("--sync-interval", type=float, default=SYNC_INTERVAL,
+                        help="secondes entre deux relectures des modifications faites hors du serveur")
+    args = parser.parse_args()
+
+    service = TicketService(args.config, autoload=False)
+    if service.remote:
+        print('Le serveur ne peut pas utiliser lui-même "storage": "http".', file=sys.stderr)
+        return 1
+    # Les écritures sur disque se font hors de la boucle asyncio (voir _run_writer)
+    service.enable_write_behind()
+    service.load_tickets(notify=False)
+    # Toutes les archives sont servies : elles sont chargées une fois pour toutes
+    service.load_archives()
+    try:
+        asyncio.run(run(TicketApiServer(service, args.sync_interval), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
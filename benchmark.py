@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+
+# Mesure des performances du service et de la fenêtre principale sur des classeurs
+# synthétiques (1 000 à 500 000 tickets), sans affichage (plateforme Qt "offscreen").
+# Pour chaque opération : durée et pic de mémoire (allocations Python/numpy suivies
+# par tracemalloc), enregistrés dans un fichier JSON à comparer d'une version à l'autre.
+# tracemalloc ralentissant fortement les opérations, chaque taille est exécutée deux
+# fois : une passe pour les durées, une passe pour la mémoire (--no-memory l'omet).
+#
+#   python benchmark.py --sizes 1000 10000 --output resultats.json
+#   python benchmark.py --data-dir bench_data   (classeurs générés conservés et réutilisés)
+
+DEFAULT_SIZES = [1000, 10000, 100000, 500000]
+
+# Saisie simulée dans les filtres texte, un caractère à la fois
+TYPED_FILTERS = {"Description": "erreur connexion", "Nom": "dupont", "N°": "123"}
+
+WORDS = (
+    "erreur connexion serveur application impossible ouvrir fichier export rapport "
+    "utilisateur mot de passe compte bloqué lenteur réseau imprimante écran mise à jour "
+    "version installation licence accès refusé données calcul résultat incorrect "
+    "message affichage fenêtre bouton menu planning maintenance avion moteur pièce "
+    "commande livraison retard documentation procédure validation signature poste "
+    "messagerie partage droits sauvegarde restauration base requête tableau graphique"
+).split()
+NAMES = ["Dupont", "Martin", "Bernard", "Durand", "Lefebvre", "Moreau", "Laurent", "Simon", "Michel", "Garcia"]
+
+
+def make_workbook(path, count, config, seed=0):
+    # Classeur de "count" tickets ; les descriptions font de 3 à 80 mots
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS, dtype=object)
+    lengths = np.clip(rng.lognormal(2.7, 0.6, count).astype(int), 3, 80)
+    descriptions = [" ".join(words[rng.integers(0, len(words), length)]) for length in lengths]
+    df = pd.DataFrame({
+        "N°": np.arange(1, count + 1),
+        "Nom": rng.choice(NAMES, count),
+        "Programme": rng.choice(config["programmes"], count),
+        "Description": descriptions,
+        "Statut": rng.choice(config["statuts"], count, p=[0.3, 0.7]),
+        "Priorité": rng.choice(config["priorites"], count)
+    })
+    df.to_excel(path, index=False, engine="openpyxl")
+
+
+def measure(results, operation, func, repeat=1, memory=False):
+    # Exécute func "repeat" fois ; memory=False : durée médiane, memory=True : pic de mémoire
+    runs = []
+    peak = 0
+    for _ in range(repeat):
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+        if memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    if memory:
+        result = {"operation": operation, "peak_memory_mb": round(peak / 1e6, 3)}
+    else:
+        result = {"operation": operation, "seconds": round(statistics.median(runs), 6)}
+        if repeat > 1:
+            result["runs"] = [round(run, 6) for run in runs]
+        print(f"  {operation:<45} {result['seconds'] * 1000:10.1f} ms")
+    results.append(result)
+    return result
+
+
+def measure_typing(results, window, column, text, memory=False):
+    # Saisie caractère par caractère : le premier filtrage part de caches vides (à froid),
+    # les suivants affinent le résultat précédent (régime établi)
+    edit = window.filters[column]
+    keystrokes = []
+    for i in range(1, len(text) + 1):
+        edit.setText(text[:i])
+        measure(keystrokes, f"filtre {column} '{text[:i]}'", window.apply_filters, memory=memory)
+    result = {"operation": f"saisie filtre {column}", "text": text, "keystrokes": keystrokes}
+    if memory:
+        result["peak_memory_mb"] = max(k["peak_memory_mb"] for k in keystrokes)
+    else:
+        seconds = [k["seconds"] for k in keystrokes]
+        result["cold_seconds"] = seconds[0]
+        result["steady_median_seconds"] = round(statistics.median(seconds[1:]), 6) if len(seconds) > 1 else seconds[0]
+        result["max_seconds"] = max(seconds)
+    results.append(result)
+    edit.setText("")
+    window.apply_filters()
+
+
+def run_size(app, directory, workbook, count, config, memory=False):
+    from ticket_service import TicketService
+    from main_window import MainWindow
+
+    work = os.path.join(directory, f"run_{count}_{'memory' if memory else 'time'}")
+    os.makedirs(work)
+    os.chdir(work)
+    shutil.copy(workbook, config["excel_path"])
+    with open("config.json", "w", encoding="utf-8") as f:
+        json.dump(dict(config, snapshot_dir=os.path.join(work, "cache")), f)
+
+    results = []
+    print(f"{count} tickets ({'mémoire' if memory else 'durées'}) :")
+    service = TicketService(autoload=False)
+    measure(results, "load_tickets (classeur, à froid)", lambda: service.load_tickets(notify=False), memory=memory)
+    service.close()
+    service = TicketService(autoload=False)
+    measure(results, "load_tickets (instantané)", lambda: service.load_tickets(notify=False), memory=memory)
+    measure(results, "save_tickets", service.save_tickets, memory=memory)
+    measure(results, "add_ticket", lambda: service.add_ticket(
+        "Benchmark", config["programmes"][0], "ticket ajouté par le benchmark", config["statuts"][0], config["priorites"][0]
+    ), repeat=3, memory=memory)
+    # Modification d'un seul ticket : réécriture du classeur, ou une ligne de journal
+    measure(results, "update_ticket", lambda: service.update_ticket(
+        1, "Benchmark", config["programmes"][-1], "ticket modifié par le benchmark", config["statuts"][0], config["priorites"][-1]
+    ), repeat=3, memory=memory)
+    if config["journal"]:
+        measure(results, "ticket_history (journal)", lambda: service.ticket_history(1), memory=memory)
+
+    holder = {}
+
+    def create_window():
+        holder["window"] = MainWindow(service)
+        holder["window"].show()
+        app.processEvents()
+
+    measure(results, "MainWindow (création et premier load_table)", create_window, memory=memory)
+    window = holder["window"]
+    measure(results, "load_table", window.load_table, memory=memory)
+    measure(results, "apply_filters (sans critère)", window.apply_filters, memory=memory)
+
+    statut = window.filters["Statut"]
+    measure(results, "filtre Statut (liste déroulante)",
+            lambda: statut.setCurrentText(config["statuts"][-1]), memory=memory)
+    statut.setCurrentText("")
+    for column, text in TYPED_FILTERS.items():
+        measure_typing(results, window, column, text, memory=memory)
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    os.chdir(directory)
+    return results
+
+
+def merge_memory(timed, traced):
+    # Reporte les pics de mémoire de la seconde passe dans les résultats de la première
+    for result, traced_result in zip(timed, traced):
+        result["peak_memory_mb"] = traced_result["peak_memory_mb"]
+        if "keystrokes" in result:
+            merge_memory(result["keystrokes"], traced_result["keystrokes"])
+    return timed
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du chargement, de l'enregistrement et du filtrage des tickets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="nombres de tickets")
+    parser.add_argument("--output", default="benchmark_results.json", help="fichier JSON des résultats")
+    parser.add_argument("--data-dir", help="dossier où conserver (et réutiliser) les classeurs générés")
+    parser.add_argument("--storage", choices=["excel", "sqlite"], default="excel")
+    parser.add_argument("--archive", action="store_true",
+                        help="tickets fermés rangés dans les archives (seuls les tickets actifs sont chargés)")
+    parser.add_argument("--journal", action="store_true",
+                        help="modifications ajoutées au journal du classeur au lieu de le réécrire")
+    parser.add_argument("--no-memory", action="store_true", help="omet la passe de mesure de la mémoire")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+
+    output = os.path.abspath(args.output)
+    data_dir = os.path.abspath(args.data_dir) if args.data_dir else None
+    directory = tempfile.mkdtemp(prefix="dcgf_bench_")
+    config = {
+        "excel_path": "suivi_jira_dcgf.xlsx",
+        "storage": args.storage,
+        "sqlite_path": "suivi_jira_dcgf.db",
+        "write_behind": False,
+        "snapshot_cache": True,
+        "archive": args.archive,
+        "journal": args.journal,
+        "programmes": ["RAFALE", "AVSIMAR", "M2000"],
+        "statuts": ["Ouvert", "Fermé"],
+        "priorites": ["P1", "P2", "P3"]
+    }
+    report = {
+        "revision": git_revision(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage": args.storage,
+        "archive": args.archive,
+        "journal": args.journal,
+        "memory_traced": not args.no_memory,
+        "sizes": {}
+    }
+    try:
+        for count in args.sizes:
+            workbook = os.path.join(data_dir or directory, f"tickets_{count}.xlsx")
+            if not os.path.exists(workbook):
+                os.makedirs(os.path.dirname(workbook), exist_ok=True)
+                print(f"Génération du classeur de {count} tickets…")
+                make_workbook(workbook, count, config)
+            results = run_size(app, directory, workbook, count, config)
+            if not args.no_memory:
+                results = merge_memory(results, run_size(app, directory, workbook, count, config, memory=True))
+            report["sizes"][str(count)] = results
+    finally:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        shutil.rmtree(directory, ignore_errors=True)
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Résultats enregistrés dans {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
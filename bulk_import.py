@@ -0,0 +1,98 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+
+from ticket_service import TicketService
+
+# Import en masse de tickets depuis un fichier CSV ou JSON lines (un objet JSON
+# par ligne), en une seule opération et une seule sauvegarde :
+#
+#   python bulk_import.py tickets.csv
+#   python bulk_import.py export_jira.jsonl --format jsonl
+#
+# Les colonnes reconnues sont Nom, Programme, Description, Statut et Priorité
+# (ou leurs équivalents sans accent ni majuscule : nom, priorite, ...).
+# Les numéros de ticket sont attribués automatiquement. Les enregistrements sans Nom
+# ou Description, ou dont le Programme, le Statut ou la Priorité ne figure pas dans
+# les listes de config.json, sont ignorés et signalés.
+
+COLUMN_ALIASES = {
+    "nom": "Nom",
+    "programme": "Programme",
+    "description": "Description",
+    "statut": "Statut",
+    "priorite": "Priorité",
+    "priorité": "Priorité"
+}
+
+
+def read_records(path, file_format):
+    if file_format == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        return list(csv.DictReader(f, dialect=dialect))
+
+
+def normalize_record(record, defaults):
+    ticket = dict(defaults)
+    for key, value in record.items():
+        if key is None:
+            continue
+        column = COLUMN_ALIASES.get(key.strip().lower())
+        if column is not None and value is not None and str(value).strip():
+            ticket[column] = str(value).strip()
+    return ticket
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import en masse de tickets (CSV ou JSON lines)")
+    parser.add_argument("path", help="fichier à importer")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="déduit de l'extension par défaut")
+    parser.add_argument("--config", default="config.json", help="fichier de configuration")
+    args = parser.parse_args(argv)
+
+    file_format = args.format
+    if file_format is None:
+        file_format = "jsonl" if os.path.splitext(args.path)[1].lower() in (".jsonl", ".json", ".ndjson") else "csv"
+
+    service = TicketService(args.config)
+    defaults = {column: (service.schema.allowed_values(column) or [""])[0] for column in service.schema.category_columns}
+
+    records = read_records(args.path, file_format)
+    tickets = []
+    skipped = 0
+    for line_number, record in enumerate(records, start=1):
+        ticket = normalize_record(record, defaults)
+        # Mêmes contrôles que dans la fenêtre "Nouveau Ticket" et l'API
+        error = service.schema.check(ticket)
+        if error is not None:
+            print(f"Enregistrement {line_number} ignoré : {error}")
+            skipped += 1
+            continue
+        tickets.append(ticket)
+
+    start = time.perf_counter()
+    numbers = service.add_tickets(tickets)
+    service.close()
+    elapsed = time.perf_counter() - start
+    if numbers:
+        print(f"{len(numbers)} tickets importés (N° {numbers[0]} à {numbers[-1]}) en {elapsed:.1f} s")
+    else:
+        print("Aucun ticket importé")
+    if skipped:
+        print(f"{skipped} enregistrements ignorés")
+    return 0 if not skipped else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
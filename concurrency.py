@@ -0,0 +1,84 @@
+import os
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+# Verrou consultatif inter-processus, posé sur un fichier "<chemin>.lock".
+# Tous les postes qui ouvrent le même classeur (partage réseau) passent par ce
+# verrou avant d'écrire, pour qu'une sauvegarde n'en écrase pas une autre.
+class FileLock:
+    def __init__(self, path, timeout=30.0, poll_interval=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._file = None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        self._file = open(self.path, "a+b")
+        while True:
+            try:
+                if os.name == "nt":
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"Verrou indisponible : {self.path}")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            if os.name == "nt":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# Attribution des numéros de ticket sans collision entre postes : le dernier
+# numéro attribué est conservé dans un fichier "<chemin>.seq", lu et incrémenté
+# sous verrou.
+class TicketNumberAllocator:
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    def allocate(self, count=1, floor=0):
+        # Réserve "count" numéros consécutifs et renvoie le premier ;
+        # floor est le plus grand numéro connu localement (initialise la séquence)
+        with FileLock(self.lock_path):
+            last = 0
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    content = f.read().strip()
+                if content:
+                    last = int(content)
+            first = max(last, int(floor)) + 1
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(str(first + count - 1))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        return first
@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+# Test de charge de l'accès concurrent : plusieurs processus ajoutent et modifient
+# des tickets dans le même classeur, puis on vérifie qu'aucune écriture n'a été
+# perdue et qu'aucun numéro n'a été attribué deux fois.
+#
+#   python concurrency_stress.py --processes 4 --tickets 25
+
+
+def worker(directory, worker_id, tickets):
+    os.chdir(directory)
+    from ticket_service import TicketService
+    service = TicketService()
+    numbers = []
+    for i in range(tickets):
+        service.add_ticket(f"proc{worker_id}", "RAFALE", f"ticket {i} du processus {worker_id}", "Ouvert", "P1")
+        numbers.append(int(service.df["N°"].iloc[-1]))
+        # Modifie un ticket de ce processus pour croiser ajouts et mises à jour
+        service.update_ticket(numbers[len(numbers) // 2], f"proc{worker_id}", "M2000",
+                              f"modifié par {worker_id}", "Ouvert", "P2")
+    service.close()
+    return numbers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'accès concurrent au fichier des tickets")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--tickets", type=int, default=20, help="tickets ajoutés par processus")
+    parser.add_argument("--storage", choices=["excel", "sqlite"], default="excel")
+    parser.add_argument("--write-behind", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    directory = tempfile.mkdtemp(prefix="dcgf_stress_")
+    config = {
+        "excel_path": "suivi_jira_dcgf.xlsx",
+        "storage": args.storage,
+        "sqlite_path": "suivi_jira_dcgf.db",
+        "write_behind": args.write_behind,
+        "write_behind_interval": 0.2,
+        "snapshot_cache": True,
+        "snapshot_dir": os.path.join(directory, "cache"),
+        "programmes": ["RAFALE", "AVSIMAR", "M2000"],
+        "statuts": ["Ouvert", "Fermé"],
+        "priorites": ["P1", "P2", "P3"]
+    }
+    with open(os.path.join(directory, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+    try:
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.starmap(worker, [(directory, i, args.tickets) for i in range(args.processes)])
+
+        os.chdir(directory)
+        from ticket_service import TicketService
+        service = TicketService()
+        allocated = [n for numbers in results for n in numbers]
+        stored = [int(n) for n in service.df["N°"]]
+        expected = args.processes * args.tickets
+        print(f"Numéros attribués : {len(allocated)} (uniques : {len(set(allocated))})")
+        print(f"Tickets enregistrés : {len(stored)} (uniques : {len(set(stored))}, attendus : {expected})")
+        modified = (service.df["Description"].astype(str).str.startswith("modifié")).sum()
+        print(f"Tickets modifiés conservés : {modified}")
+        ok = len(set(allocated)) == expected and sorted(stored) == sorted(allocated)
+        print("OK" if ok else "ÉCHEC")
+        service.close()
+        return 0 if ok else 1
+    finally:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,20 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QLineEdit, QTextEdit, QComboBox, QPushButton, QMessageBox
-import json
+
+from ticket_service import TicketConflictError
 
 class EditTicketDialog(QDialog):
-    def __init__(self, ticket_service, ticket_data, config_path="config.json", parent=None):
+    def __init__(self, ticket_service, ticket_data, parent=None):
         super().__init__(parent)
         self.ticket_service = ticket_service
         self.ticket_data = ticket_data
         self.setWindowTitle("Modifier Ticket")
         self.resize(500, 300)
 
-        with open(config_path, "r", encoding="utf-8") as f:
-            self.config = json.load(f)
-
-        self.programmes = self.config.get("programmes", [])
-        self.statuts = self.config.get("statuts", [])
-        self.priorites = self.config.get("priorites", [])
+        # Valeurs autorisées lues dans le schéma partagé (config.json n'est pas relu)
+        schema = ticket_service.schema
+        self.programmes = schema.allowed_values("Programme")
+        self.statuts = schema.allowed_values("Statut")
+        self.priorites = schema.allowed_values("Priorité")
 
         layout = QVBoxLayout()
         form_layout = QFormLayout()
@@ -68,5 +68,15 @@ class EditTicketDialog(QDialog):
             return
 
         ticket_number = self.ticket_data.get("N°")
-        self.ticket_service.update_ticket(ticket_number, nom, programme, description, statut, priorite)
+        try:
+            self.ticket_service.update_ticket(ticket_number, nom, programme, description, statut, priorite,
+                                              expected=self.ticket_data)
+        except TicketConflictError as e:
+            QMessageBox.warning(
+                self, "Conflit",
+                f"{e}\nLe ticket a été modifié par un autre utilisateur depuis l'ouverture de cette fenêtre ; "
+                "vos modifications n'ont pas été enregistrées. Rouvrez le ticket pour voir sa version à jour."
+            )
+            self.reject()
+            return
         self.accept()
\ No newline at end of file
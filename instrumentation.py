@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import bisect
+import cProfile
+import datetime
+import inspect
+import functools
+import threading
+
+# Instrumentation optionnelle : activée par la clé "instrumentation" de config.json
+# ou par la variable d'environnement DCGF_INSTRUMENTATION=1. Désactivée, elle ne coûte
+# rien : aucune méthode n'est enveloppée et aucune mesure n'est prise.
+ENV_VAR = "DCGF_INSTRUMENTATION"
+
+# Bornes supérieures (en ms) des classes des histogrammes ; une dernière classe
+# reçoit les durées au-delà de 10 s
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+def instrumentation_enabled(config):
+    return bool(config.get("instrumentation", False)) or os.environ.get(ENV_VAR) == "1"
+
+
+# Histogramme des durées d'une opération (classes de largeur croissante)
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        # Borne supérieure de la classe contenant le p-ième centile (en ms)
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max)
+        return self.max
+
+    def to_dict(self):
+        buckets = {f"<={bound}ms": count for bound, count in zip(BUCKETS_MS, self.counts) if count}
+        if self.counts[-1]:
+            buckets[f">{BUCKETS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max, 3),
+            "buckets": buckets
+        }
+
+
+# Mesure des durées des opérations du TicketService et de la fenêtre principale.
+# Les méthodes sont enveloppées sur l'instance (wrap) ; les histogrammes restent
+# en mémoire et sont écrits dans "output_dir" sur demande ou à la fermeture.
+class Instrumentation:
+    def __init__(self, output_dir="profiling"):
+        self.output_dir = output_dir
+        self.histograms = {}
+        # (nom de l'opération, durée en secondes) de la dernière opération terminée
+        self.last = None
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._closed = False
+
+    def wrap(self, obj, method_names, prefix):
+        # Remplace chaque méthode de l'instance par une version chronométrée. Elle doit
+        # être appelée avant de connecter ces méthodes à des signaux Qt.
+        for name in method_names:
+            setattr(obj, name, self._timed(getattr(obj, name), f"{prefix}.{name}"))
+
+    def _timed(self, method, operation):
+        code = method.__func__.__code__ if hasattr(method, "__func__") else method.__code__
+        # Comme PyQt pour une méthode, les arguments en trop transmis par un signal
+        # (ex. "checked" de QPushButton.clicked) sont ignorés
+        max_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount - (1 if hasattr(method, "__self__") else 0)
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(operation, time.perf_counter() - start)
+        return timed
+
+    def record(self, operation, seconds):
+        # Peut être appelée depuis le thread de chargement ou d'enregistrement différé
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.add(seconds)
+            self.last = (operation, seconds)
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def start_profile(self):
+        # cProfile ne suit que le thread appelant (celui de l'interface)
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self):
+        # Arrête le profilage et écrit le fichier .prof (lisible avec pstats ou snakeviz)
+        if self._profiler is None:
+            return None
+        self._profiler.disable()
+        path = self._output_path("profile", "prof")
+        self._profiler.dump_stats(path)
+        self._profiler = None
+        return path
+
+    def report(self):
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: item[1].total, reverse=True)
+            lines = [f"{'Opération':<40} {'nb':>6} {'moy. ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+            for operation, histogram in items:
+                stats = histogram.to_dict()
+                lines.append(f"{operation:<40} {stats['count']:>6} {stats['mean_ms']:>9.1f} "
+                             f"{stats['p95_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+        return "\n".join(lines)
+
+    def dump(self):
+        # Écrit les histogrammes au format JSON et renvoie le chemin du fichier
+        with self._lock:
+            data = {operation: histogram.to_dict() for operation, histogram in self.histograms.items()}
+        path = self._output_path("latencies", "json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
+
+    def close(self):
+        # Arrête le profilage en cours et écrit les histogrammes (une seule fois)
+        if self._closed:
+            return
+        self._closed = True
+        path = self.stop_profile()
+        if path is not None:
+            print("Profil enregistré :", path, file=sys.stderr)
+        if self.histograms:
+            try:
+                print("Durées enregistrées :", self.dump(), file=sys.stderr)
+            except OSError as e:
+                print("Impossible d'écrire les durées :", e, file=sys.stderr)
+
+    def _output_path(self, kind, extension):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.output_dir, f"{kind}_{stamp}.{extension}")
@@ -1,8 +1,12 @@
+import time
+START_TIME = time.perf_counter()
+
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QPalette, QColor
 from ticket_service import TicketService
 from main_window import MainWindow
+from startup_timing import StartupTimer
 
 def main():
     app = QApplication(sys.argv)
@@ -26,9 +30,14 @@ def main():
 
     app.setPalette(palette)
 
-    # Initialisation du service et de la fenêtre principale
-    ticket_service = TicketService()
+    # Initialisation du service et de la fenêtre principale.
+    # Les tickets ne sont pas lus ici : la fenêtre s'affiche d'abord, puis la table
+    # est remplie par un chargement en arrière-plan (import de pandas compris).
+    ticket_service = TicketService(autoload=False)
+    timer = StartupTimer(START_TIME, ticket_service.config.get("startup_timing", False))
+    timer.mark("imports et création de l'application")
     window = MainWindow(ticket_service)
+    timer.attach(window)
     window.show()
 
     sys.exit(app.exec_())
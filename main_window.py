@@ -1,21 +1,46 @@
 import os
-import json
 import datetime
 from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QHBoxLayout, QPushButton, QLineEdit, QLabel, QMessageBox, QDialog,
-    QHeaderView, QComboBox, QSizePolicy
+    QMainWindow, QWidget, QVBoxLayout, QTableView, QAbstractItemView,
+    QHBoxLayout, QPushButton, QLineEdit, QLabel, QMessageBox,
+    QHeaderView, QComboBox, QSizePolicy, QFileDialog, QShortcut, QProgressBar,
+    QApplication, QInputDialog, QTextEdit
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtCore import Qt, QTimer, QEvent, QFileSystemWatcher, pyqtSignal
+from PyQt5.QtGui import QFont, QFontDatabase, QKeySequence
 
+from ticket_filter import TicketFilter
+from ticket_loader import TicketLoader
+from ticket_table_model import TicketTableModel
+from row_heights import RowHeightCache
 from new_ticket_window import NewTicketDialog
 from edit_ticket_window import EditTicketDialog
+from statistics_window import StatisticsDialog
+from ticket_stats import TicketStatistics
+
+# Rafraîchissements et filtres chronométrés lorsque l'instrumentation est activée.
+# Les actions passant par une fenêtre (Nouveau, Modifier, Supprimer, Exporter) ne le
+# sont pas ici, le temps passé par l'utilisateur dans la fenêtre fausserait la mesure :
+# les opérations du service (add_ticket, update_ticket...) couvrent le travail fait
+# après validation, mise à jour de la table comprise (notifications).
+INSTRUMENTED_OPERATIONS = (
+    "load_table", "on_ticket_changed", "apply_filters", "sync_from_disk",
+    "show_archive_page", "show_all_archives"
+)
 
 class MainWindow(QMainWindow):
+    # Émis lorsque la table a été remplie après le chargement initial des tickets
+    tickets_loaded = pyqtSignal()
+
     def __init__(self, ticket_service):
         super().__init__()
         self.ticket_service = ticket_service
+        self.loader = None
+        self.instrumentation = ticket_service.instrumentation
+        if self.instrumentation is not None:
+            # Avant toute connexion de signal, pour que ce soient les versions
+            # chronométrées des méthodes qui soient connectées
+            self.instrumentation.wrap(self, INSTRUMENTED_OPERATIONS, "MainWindow")
         self.setWindowTitle("Gestion des Tickets")
         # Taille par défaut : ici 1000 x 700 px (modifiable)
         self.resize(1000, 700)
@@ -30,50 +55,69 @@ class MainWindow(QMainWindow):
         self.top_layout = QHBoxLayout()
         self.mod_date_label = QLabel()
         self.mod_date_label.setStyleSheet("color: #555;")
+        # Indicateur d'enregistrement différé (modifications non enregistrées / en cours)
+        self.save_state_label = QLabel()
+        # Progression de la lecture des tickets, visible pendant le chargement
+        self.load_progress = QProgressBar()
+        self.load_progress.setFixedWidth(200)
+        self.load_progress.setTextVisible(False)
+        self.load_progress.hide()
+        # Archives (tickets clos) : chargées page par page à la demande
+        if self.ticket_service.archive_enabled:
+            self.archive_label = QLabel()
+            self.archive_label.setStyleSheet("color: #555;")
+            self.btn_archive_page = QPushButton("Archives : page suivante")
+            self.btn_archive_page.clicked.connect(self.show_archive_page)
+            self.btn_archive_all = QPushButton("Toutes les archives")
+            self.btn_archive_all.clicked.connect(self.show_all_archives)
+            self.top_layout.addWidget(self.archive_label)
+            self.top_layout.addWidget(self.btn_archive_page)
+            self.top_layout.addWidget(self.btn_archive_all)
         self.top_layout.addStretch()
+        self.top_layout.addWidget(self.load_progress)
+        self.top_layout.addWidget(self.save_state_label)
         self.top_layout.addWidget(self.mod_date_label)
         self.layout.addLayout(self.top_layout)
         self.update_mod_date_label()
+        self.save_state = None
+        self.save_state_timer = QTimer(self)
+        self.save_state_timer.setInterval(250)
+        self.save_state_timer.timeout.connect(self.update_save_state_label)
+        self.save_state_timer.start()
 
-        # Charger la configuration pour récupérer les listes de filtres
-        with open("config.json", "r", encoding="utf-8") as f:
-            self.config = json.load(f)
-        self.filter_mapping = {
-            "Programme": self.config.get("programmes", []),
-            "Statut": self.config.get("statuts", []),
-            "Priorité": self.config.get("priorites", [])
-        }
+        # Configuration et schéma des colonnes (types, valeurs autorisées, largeurs,
+        # couleurs) partagés avec le TicketService ; relus lorsque config.json change
+        self.registry = self.ticket_service.registry
+        schema = self.registry.schema
+        # Moteur de filtrage (colonnes en minuscules mises en cache, recherche littérale)
+        self.ticket_filter = TicketFilter(self.ticket_service, exact_columns=schema.category_columns)
+        # Temporisation de la saisie : le filtre n'est appliqué qu'après une courte pause
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+        self.filter_timer.timeout.connect(self.apply_filters)
 
         # -- Zone de filtres (champs de recherche) --
         self.filter_layout = QHBoxLayout()
         self.filter_layout.setSpacing(8)
         self.filter_layout.setAlignment(Qt.AlignLeft)
         self.filters = {}
-        # Largeurs fixes pour les champs de filtre
-        filter_widths = {
-            "N°": 50,
-            "Nom": 120,
-            "Description": 200,
-            "Programme": 150,
-            "Statut": 150,
-            "Priorité": 150
-        }
         # Pour chaque colonne, créer un label et le widget de filtre correspondant
-        for header in self.ticket_service.columns:
+        for column in schema.columns:
+            header = column.name
             lbl = QLabel(header)
             # Appliquer la police de la fenêtre pour les labels
             font = lbl.font()
             font.setPointSize(self.table_font_size())
             lbl.setFont(font)
             lbl.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-            if header in self.filter_mapping:
+            if column.kind == "category":
                 # Pour les colonnes avec des valeurs définies dans config.json, utiliser un QComboBox
                 combo = QComboBox()
                 combo.addItem("")  # Option vide pour ne pas filtrer
-                combo.addItems(self.filter_mapping[header])
+                combo.addItems(schema.allowed_values(header))
                 combo.currentTextChanged.connect(self.apply_filters)
-                if header in filter_widths:
-                    combo.setFixedWidth(filter_widths[header])
+                combo.setFixedWidth(column.filter_width)
                 combo.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
                 self.filter_layout.addWidget(lbl)
                 self.filter_layout.addWidget(combo)
@@ -82,9 +126,8 @@ class MainWindow(QMainWindow):
                 # Sinon, utiliser un QLineEdit
                 edit = QLineEdit()
                 edit.setPlaceholderText(f"Filtrer par {header}")
-                edit.textChanged.connect(self.apply_filters)
-                if header in filter_widths:
-                    edit.setFixedWidth(filter_widths[header])
+                edit.textChanged.connect(self.filter_timer.start)
+                edit.setFixedWidth(column.filter_width)
                 edit.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
                 self.filter_layout.addWidget(lbl)
                 self.filter_layout.addWidget(edit)
@@ -94,29 +137,47 @@ class MainWindow(QMainWindow):
         self.filter_layout.addStretch()
         self.layout.addLayout(self.filter_layout)
 
+        # -- Filtres enregistrés (clé "saved_filters" de config.json) --
+        self.saved_filters_layout = QHBoxLayout()
+        self.saved_filters_layout.setAlignment(Qt.AlignLeft)
+        self.saved_filters_layout.addWidget(QLabel("Filtres enregistrés :"))
+        self.saved_filter_combo = QComboBox()
+        self.saved_filter_combo.setMinimumWidth(200)
+        # "activated" : choix fait par l'utilisateur uniquement
+        self.saved_filter_combo.activated.connect(self.apply_saved_filter)
+        self.saved_filters_layout.addWidget(self.saved_filter_combo)
+        self.btn_save_filter = QPushButton("Enregistrer le filtre")
+        self.btn_save_filter.clicked.connect(self.save_current_filter)
+        self.saved_filters_layout.addWidget(self.btn_save_filter)
+        self.btn_delete_filter = QPushButton("Supprimer le filtre")
+        self.btn_delete_filter.clicked.connect(self.delete_saved_filter)
+        self.saved_filters_layout.addWidget(self.btn_delete_filter)
+        self.saved_filters_layout.addStretch()
+        self.layout.addLayout(self.saved_filters_layout)
+        self.update_saved_filter_combo()
+
         # -- Table affichant les tickets --
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(self.ticket_service.columns))
-        self.table.setHorizontalHeaderLabels(self.ticket_service.columns)
+        # Vue sur un modèle lisant directement le DataFrame (aucun item créé par cellule)
+        self.table_model = TicketTableModel(schema, self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSortingEnabled(True)
         self.table.setAlternatingRowColors(True)
         self.table.setWordWrap(True)
         self.table.setTextElideMode(Qt.ElideNone)
         # Définir l'alternate background color en bleu très clair
-        self.table.setStyleSheet("QTableWidget { alternate-background-color: #E0F7FA; }")
+        self.table.setStyleSheet("QTableView { alternate-background-color: #E0F7FA; }")
 
         # Configuration du mode de redimensionnement des colonnes
+        # (largeur fixe, sauf la colonne Description qui occupe la place restante, voir ticket_schema)
         header_view = self.table.horizontalHeader()
-        header_view.setSectionResizeMode(0, QHeaderView.Fixed)   # N°
-        header_view.setSectionResizeMode(1, QHeaderView.Fixed)   # Nom
-        header_view.setSectionResizeMode(2, QHeaderView.Fixed)   # Programme
-        header_view.setSectionResizeMode(4, QHeaderView.Fixed)   # Statut
-        header_view.setSectionResizeMode(5, QHeaderView.Fixed)   # Priorité
-        header_view.setSectionResizeMode(3, QHeaderView.Stretch) # Description
+        for col, column in enumerate(schema.columns):
+            header_view.setSectionResizeMode(col, QHeaderView.Stretch if column.stretch else QHeaderView.Fixed)
 
-        # Redimensionnement vertical automatique (hauteur de ligne)
-        vertical_header = self.table.verticalHeader()
-        vertical_header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        # Hauteur des lignes adaptée au texte renvoyé à la ligne, calculée à la demande
+        # (lignes visibles d'abord, les autres en tâche de fond) et mise en cache
+        self.row_heights = RowHeightCache(self.table, self.table_model, schema.wrapped_columns, self)
 
         # Appliquer la police des entêtes pour qu'elle corresponde au contenu
         self.set_header_font(self.table.font())
@@ -134,9 +195,98 @@ class MainWindow(QMainWindow):
         self.btn_delete = QPushButton("Supprimer Ticket")
         self.btn_delete.clicked.connect(self.delete_ticket)
         self.button_layout.addWidget(self.btn_delete)
+        self.btn_export = QPushButton("Exporter vers Excel")
+        self.btn_export.clicked.connect(self.export_excel)
+        self.button_layout.addWidget(self.btn_export)
+        self.btn_statistics = QPushButton("Statistiques")
+        self.btn_statistics.clicked.connect(self.show_statistics)
+        self.button_layout.addWidget(self.btn_statistics)
         self.layout.addLayout(self.button_layout)
 
-        self.load_table()
+        if self.instrumentation is not None:
+            self.setup_instrumentation()
+
+        # Les modifications du service sont répercutées ligne par ligne
+        self.ticket_service.subscribe(self.on_ticket_changed)
+        # Nombre de tickets par Programme, Statut et Priorité, tenu à jour au fil des
+        # modifications (fenêtre "Statistiques", créée à la première ouverture)
+        self.statistics = TicketStatistics(self.ticket_service)
+        self.statistics_dialog = None
+
+        # Surveillance du fichier : les modifications faites par d'autres postes sont
+        # relues (ticket par ticket) peu après leur enregistrement
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.setInterval(500)
+        self.sync_timer.timeout.connect(self.sync_from_disk)
+        # config.json est surveillé lui aussi : listes de valeurs, largeurs et couleurs
+        # sont relues sans redémarrer l'application
+        self.config_timer = QTimer(self)
+        self.config_timer.setSingleShot(True)
+        self.config_timer.setInterval(200)
+        self.config_timer.timeout.connect(self.reload_config)
+        self.registry.listeners.append(self.on_config_changed)
+        self.watch_file()
+        if self.ticket_service.remote:
+            # Client du serveur d'API : aucun fichier à surveiller, les modifications des
+            # autres clients sont relevées périodiquement (requête conditionnelle)
+            self.poll_timer = QTimer(self)
+            self.poll_timer.setInterval(int(self.ticket_service.config.get("api_poll_interval", 5) * 1000))
+            self.poll_timer.timeout.connect(self.sync_from_disk)
+            self.poll_timer.start()
+        if self.ticket_service.loaded:
+            self.load_table()
+        else:
+            self.start_loading()
+
+    def setup_instrumentation(self):
+        # Barre d'état : durée de la dernière opération ; Ctrl+Maj+P démarre / arrête
+        # le profilage (cProfile), Ctrl+Maj+H enregistre les histogrammes des durées
+        self.latency_label = QLabel()
+        self.latency_label.setStyleSheet("color: #555;")
+        self.statusBar().addPermanentWidget(self.latency_label)
+        self.last_operation = None
+        self.latency_timer = QTimer(self)
+        self.latency_timer.setInterval(250)
+        self.latency_timer.timeout.connect(self.update_latency_label)
+        self.latency_timer.start()
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, self.toggle_profiling)
+        QShortcut(QKeySequence("Ctrl+Shift+H"), self, self.dump_latencies)
+
+    def update_latency_label(self):
+        last = self.instrumentation.last
+        if last is None or last is self.last_operation:
+            return
+        self.last_operation = last
+        operation, seconds = last
+        self.latency_label.setText(f"{operation} : {seconds * 1000:.0f} ms")
+
+    def toggle_profiling(self):
+        if self.instrumentation.profiling:
+            path = self.instrumentation.stop_profile()
+            self.statusBar().showMessage(f"Profil enregistré : {path}", 10000)
+        else:
+            self.instrumentation.start_profile()
+            self.statusBar().showMessage("Profilage en cours (Ctrl+Maj+P pour arrêter)")
+
+    def dump_latencies(self):
+        try:
+            path = self.instrumentation.dump()
+        except OSError as e:
+            QMessageBox.warning(self, "Erreur", f"Enregistrement impossible : {e}")
+            return
+        self.statusBar().showMessage(f"Durées enregistrées : {path}", 10000)
+        # Résumé par opération dans les détails de la fenêtre (en police à chasse fixe,
+        # le tableau étant aligné en colonnes)
+        box = QMessageBox(QMessageBox.Information, "Durées des opérations", f"Durées enregistrées : {path}",
+                          QMessageBox.Ok, self)
+        box.setDetailedText(self.instrumentation.report())
+        details = box.findChild(QTextEdit)
+        if details is not None:
+            details.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        box.exec_()
 
     def table_font_size(self):
         # Utilise la police par défaut de la fenêtre
@@ -148,132 +298,337 @@ class MainWindow(QMainWindow):
 
     def update_mod_date_label(self):
         # Met à jour le label avec la date de dernière modification du fichier Excel
+        # (ou de son journal des modifications)
         file_path = self.ticket_service.file_path
-        if os.path.exists(file_path):
-            mod_timestamp = os.path.getmtime(file_path)
+        if self.ticket_service.remote:
+            self.mod_date_label.setText(f"Serveur : {file_path}")
+        elif os.path.exists(file_path):
+            paths = [path for path in self.ticket_service.watched_paths() if os.path.exists(path)]
+            mod_timestamp = max(os.path.getmtime(path) for path in paths)
             mod_date = datetime.datetime.fromtimestamp(mod_timestamp)
             formatted_date = mod_date.strftime("%d/%m/%Y %H:%M:%S")
             self.mod_date_label.setText(f"Derniére modification : {formatted_date}")
         else:
             self.mod_date_label.setText("Fichier non trouvé")
 
+    def watch_file(self):
+        # Le fichier étant remplacé à chaque enregistrement, il faut le resurveiller
+        # (ainsi que le journal "-wal" d'une base SQLite ou le journal des modifications),
+        # de même que config.json
+        for path in self.ticket_service.watched_paths() + [self.registry.path]:
+            if os.path.exists(path) and path not in self.file_watcher.files():
+                self.file_watcher.addPath(path)
+
+    def on_file_changed(self, path):
+        if path == self.registry.path:
+            self.config_timer.start()
+        else:
+            self.sync_timer.start()
+
+    def reload_config(self):
+        self.watch_file()
+        self.registry.reload()
+
+    def on_config_changed(self):
+        # Nouvelle configuration : listes des filtres, largeurs et couleurs mises à jour
+        # en conservant les critères saisis (le moteur de stockage reste celui du démarrage)
+        schema = self.registry.schema
+        criteria = self.current_criteria()
+        for column in schema.columns:
+            widget = self.filters[column.name]
+            widget.setFixedWidth(column.filter_width)
+            if column.kind == "category":
+                widget.blockSignals(True)
+                widget.clear()
+                widget.addItem("")
+                widget.addItems(schema.allowed_values(column.name))
+                widget.blockSignals(False)
+        self.table_model.set_schema(schema)
+        self.set_column_widths()
+        self.table.viewport().update()
+        self.update_saved_filter_combo(self.saved_filter_combo.currentText())
+        self.set_filter_criteria(criteria)
+
+    def sync_from_disk(self):
+        self.watch_file()
+        self.ticket_service.sync_from_disk()
+
+    def update_save_state_label(self):
+        if self.ticket_service.storage.external_changes and not self.sync_timer.isActive():
+            # Un enregistrement a fusionné des modifications d'un autre poste (le délai
+            # n'est pas relancé à chaque passage, sans quoi il n'expirerait jamais)
+            self.sync_timer.start()
+        state = self.ticket_service.save_state()
+        if state == self.save_state:
+            return
+        if state == "pending":
+            self.save_state_label.setText("● Modifications non enregistrées")
+            self.save_state_label.setStyleSheet("color: #B9770E;")
+        elif state == "saving":
+            self.save_state_label.setText("Enregistrement…")
+            self.save_state_label.setStyleSheet("color: #555;")
+        elif state == "error":
+            self.save_state_label.setText("● Échec de l'enregistrement, nouvel essai en cours")
+            self.save_state_label.setStyleSheet("color: #C0392B;")
+        else:
+            self.save_state_label.setText("")
+            if self.save_state is not None:
+                self.update_mod_date_label()
+                self.update_archive_label()
+                self.watch_file()
+        self.save_state = state
+
+    def start_loading(self):
+        # Chargement des tickets en arrière-plan ; les actions sont désactivées d'ici là
+        for button in self.load_dependent_buttons():
+            button.setEnabled(False)
+        self.mod_date_label.setText("Chargement des tickets…")
+        # Indicateur d'activité jusqu'à la première progression connue
+        self.load_progress.setRange(0, 0)
+        self.load_progress.show()
+        self.loader = TicketLoader(self.ticket_service, self)
+        self.loader.preview.connect(self.on_load_preview)
+        self.loader.progress.connect(self.on_load_progress)
+        self.loader.loaded.connect(self.on_tickets_loaded)
+        # Démarré depuis la boucle d'événements, une fois la fenêtre affichée
+        QTimer.singleShot(0, self.loader.start)
+
+    def load_dependent_buttons(self):
+        # Boutons désactivés tant que les tickets ne sont pas chargés
+        buttons = [self.btn_new, self.btn_edit, self.btn_delete, self.btn_export, self.btn_statistics]
+        if self.ticket_service.archive_enabled:
+            buttons += [self.btn_archive_page, self.btn_archive_all]
+        return buttons
+
+    def on_load_preview(self, df):
+        # Premières lignes lues : affichées (sans filtre) en attendant la suite
+        if self.ticket_service.loaded:
+            return
+        self.table_model.set_dataframe(df)
+        self.set_column_widths()
+
+    def on_load_progress(self, rows_read, total_rows):
+        if total_rows:
+            self.load_progress.setRange(0, total_rows)
+            self.load_progress.setValue(rows_read)
+            self.mod_date_label.setText(f"Chargement des tickets… {rows_read} / {total_rows}")
+
+    def on_tickets_loaded(self):
+        self.load_progress.hide()
+        for button in self.load_dependent_buttons():
+            button.setEnabled(True)
+        self.ticket_service.notify("reset")
+        self.watch_file()
+        self.tickets_loaded.emit()
+
     def load_table(self):
-        df = self.ticket_service.df
-        self.table.setRowCount(0)
-        for _, row in df.iterrows():
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-            for col, col_name in enumerate(self.ticket_service.columns):
-                text = str(row[col_name]).rstrip()
-                item = QTableWidgetItem(text)
-                # Centrer le contenu pour les colonnes "N°" et "Priorité"
-                if col_name == "N°" or col_name == "Priorité":
-                    item.setTextAlignment(Qt.AlignCenter)
-                # Code couleur pour "Statut"
-                if col_name == "Statut":
-                    if text == "Ouvert":
-                        item.setBackground(QColor("#82E0AA"))
-                    elif text == "Fermé":
-                        item.setBackground(QColor("#F1948A"))
-                # Code couleur pour "Priorité"
-                if col_name == "Priorité":
-                    if text == "P1":
-                        item.setBackground(QColor("#85C1E9"))
-                    elif text == "P2":
-                        item.setBackground(QColor("#F8C471"))
-                    elif text == "P3":
-                        item.setBackground(QColor("#E74C3C"))
-                self.table.setItem(row_position, col, item)
+        # Le modèle lit les colonnes du DataFrame ; les couleurs et alignements
+        # sont servis à la demande par TicketTableModel.data()
+        self.table_model.set_dataframe(self.ticket_service.df)
         self.set_column_widths()
-        self.table.resizeRowsToContents()
+        self.apply_filters()
         self.table.repaint()
         self.update_mod_date_label()
+        self.update_archive_label()
+
+    def on_ticket_changed(self, change):
+        # Mise à jour ciblée de la table à partir des notifications du TicketService
+        if change.kind == "reset":
+            self.load_table()
+            return
+        self.table_model.patch_arrays(self.ticket_service.df, change.kind, change.position)
+        if change.kind == "removed":
+            self.table_model.remove_position(change.position)
+        elif change.kind == "inserted":
+            if self.ticket_filter.matches(change.position):
+                self.table_model.insert_position(change.position)
+                row = self.table_model.row_of_position(change.position)
+                self.table.scrollTo(self.table_model.index(row, 0))
+        elif change.kind == "updated":
+            visible = self.table_model.row_of_position(change.position) is not None
+            matches = self.ticket_filter.matches(change.position)
+            if visible and matches:
+                self.table_model.update_position(change.position)
+            elif visible:
+                self.table_model.hide_position(change.position)
+            elif matches:
+                self.table_model.insert_position(change.position)
+        self.update_mod_date_label()
+        if self.ticket_service.archive_enabled and self.ticket_service.archived_status in (
+                (change.old or {}).get("Statut"), (change.new or {}).get("Statut")):
+            # Ticket clos ou rouvert : le nombre de lignes d'archives a pu changer
+            self.update_archive_label()
+        self.watch_file()
 
     def set_column_widths(self):
-        fixed_widths = {
-            "N°": 50,
-            "Nom": 120,
-            "Programme": 100,
-            "Description": 400,
-            "Statut": 80,
-            "Priorité": 60
-        }
-        for col, header in enumerate(self.ticket_service.columns):
-            if header in fixed_widths:
-                self.table.setColumnWidth(col, fixed_widths[header])
+        for col, column in enumerate(self.registry.schema.columns):
+            self.table.setColumnWidth(col, column.width)
 
-    def apply_filters(self):
-        df = self.ticket_service.df.copy()
+    def current_criteria(self):
+        # Texte de chaque filtre (chaîne vide : pas de filtre sur la colonne)
+        criteria = {}
         for header, widget in self.filters.items():
             if isinstance(widget, QLineEdit):
-                filter_text = widget.text().strip().lower()
+                criteria[header] = widget.text()
             elif isinstance(widget, QComboBox):
-                filter_text = widget.currentText().strip().lower()
+                criteria[header] = widget.currentText()
+        return criteria
+
+    def set_filter_criteria(self, criteria):
+        # Remplit tous les filtres (colonnes absentes : filtre vidé) et ne filtre qu'une fois
+        for header, widget in self.filters.items():
+            widget.blockSignals(True)
+            value = criteria.get(header, "")
+            if isinstance(widget, QLineEdit):
+                widget.setText(value)
             else:
-                filter_text = ""
-            if filter_text:
-                df = df[df[header].astype(str).str.lower().str.contains(filter_text)]
-        self.table.setRowCount(0)
-        for _, row in df.iterrows():
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-            for col, col_name in enumerate(self.ticket_service.columns):
-                text = str(row[col_name]).rstrip()
-                item = QTableWidgetItem(text)
-                if col_name == "N°" or col_name == "Priorité":
-                    item.setTextAlignment(Qt.AlignCenter)
-                if col_name == "Statut":
-                    if text == "Ouvert":
-                        item.setBackground(QColor("#82E0AA"))
-                    elif text == "Fermé":
-                        item.setBackground(QColor("#F1948A"))
-                if col_name == "Priorité":
-                    if text == "P1":
-                        item.setBackground(QColor("#85C1E9"))
-                    elif text == "P2":
-                        item.setBackground(QColor("#F8C471"))
-                    elif text == "P3":
-                        item.setBackground(QColor("#E74C3C"))
-                self.table.setItem(row_position, col, item)
-        self.set_column_widths()
-        self.table.resizeRowsToContents()
+                widget.setCurrentIndex(max(widget.findText(value), 0))
+            widget.blockSignals(False)
+        self.apply_filters()
+
+    def apply_filters(self):
+        self.filter_timer.stop()
+        if not self.ticket_service.loaded:
+            return
+        criteria = self.current_criteria()
+        selected = self.saved_filter_combo.currentText()
+        if selected and self.saved_filters().get(selected) != self._non_empty(criteria):
+            # Filtres modifiés à la main : le filtre enregistré n'est plus celui affiché
+            self.saved_filter_combo.setCurrentIndex(0)
+        if (self.ticket_service.archive_enabled and criteria.get("Statut") == self.ticket_service.archived_status
+                and not self.ticket_service.archives_complete):
+            # Filtre sur le statut des archives : toutes les archives sont chargées
+            self.show_all_archives()
+        self.table_model.set_rows(self.ticket_filter.filter(criteria))
         self.table.repaint()
 
+    # -- Filtres enregistrés --
+
+    def saved_filters(self):
+        return self.ticket_service.config.get("saved_filters", {})
+
+    def update_saved_filter_combo(self, selected=""):
+        self.saved_filter_combo.clear()
+        self.saved_filter_combo.addItem("")
+        self.saved_filter_combo.addItems(list(self.saved_filters()))
+        self.saved_filter_combo.setCurrentIndex(max(self.saved_filter_combo.findText(selected), 0))
+
+    def apply_saved_filter(self, index):
+        name = self.saved_filter_combo.itemText(index)
+        if name:
+            self.set_filter_criteria(self.saved_filters().get(name, {}))
+
+    def save_current_filter(self):
+        criteria = self._non_empty(self.current_criteria())
+        if not criteria:
+            QMessageBox.information(self, "Filtres enregistrés", "Aucun critère de filtre à enregistrer.")
+            return
+        name, ok = QInputDialog.getText(self, "Enregistrer le filtre", "Nom du filtre :",
+                                        text=self.saved_filter_combo.currentText())
+        name = name.strip()
+        if not ok or not name:
+            return
+        saved = dict(self.saved_filters())
+        if name in saved and saved[name] != criteria:
+            reply = QMessageBox.question(self, "Filtres enregistrés", f"Remplacer le filtre « {name} » ?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        saved[name] = criteria
+        self.store_saved_filters(saved, name)
+
+    def delete_saved_filter(self):
+        name = self.saved_filter_combo.currentText()
+        if not name:
+            return
+        reply = QMessageBox.question(self, "Filtres enregistrés", f"Supprimer le filtre « {name} » ?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        saved = dict(self.saved_filters())
+        saved.pop(name, None)
+        self.store_saved_filters(saved)
+
+    def store_saved_filters(self, saved, selected=""):
+        try:
+            self.ticket_service.save_config(saved_filters=saved)
+        except OSError as e:
+            QMessageBox.warning(self, "Erreur", f"Enregistrement de config.json impossible : {e}")
+            return
+        self.update_saved_filter_combo(selected)
+
+    @staticmethod
+    def _non_empty(criteria):
+        return {header: text for header, text in criteria.items() if text.strip()}
+
+    def show_statistics(self):
+        if self.statistics_dialog is None:
+            self.statistics_dialog = StatisticsDialog(self.statistics, self.ticket_service, self)
+            self.statistics_dialog.filter_requested.connect(self.set_filter_criteria)
+        self.statistics_dialog.show()
+        self.statistics_dialog.raise_()
+        self.statistics_dialog.activateWindow()
+
+    def update_archive_label(self):
+        if not self.ticket_service.archive_enabled or not self.ticket_service.loaded:
+            return
+        try:
+            loaded, total = self.ticket_service.archive_progress()
+        except Exception as e:
+            # Appelée après chaque chargement ou modification : pas de fenêtre bloquante
+            self.statusBar().showMessage(f"Erreur lors de la lecture des archives : {e}", 10000)
+            return
+        self.archive_label.setText(f"Archives : {loaded} / {total} tickets chargés")
+        complete = loaded >= total
+        self.btn_archive_page.setEnabled(not complete)
+        self.btn_archive_all.setEnabled(not complete)
+
+    def show_archive_page(self):
+        self.run_archive_load(self.ticket_service.load_archive_page)
+
+    def show_all_archives(self):
+        self.run_archive_load(self.ticket_service.load_archives)
+
+    def run_archive_load(self, load):
+        # Les tickets lus sont ajoutés à la table via les notifications du service
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            load()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.update_archive_label()
+
     def open_new_ticket(self):
         dialog = NewTicketDialog(self.ticket_service, parent=self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.ticket_service.load_tickets()
-            self.load_table()
+        dialog.exec_()
 
     def edit_ticket(self):
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "Avertissement", "Veuillez sélectionner un ticket à modifier.")
             return
-        row = selected_items[0].row()
-        ticket_num_item = self.table.item(row, 0)
+        row = selected_rows[0].row()
         try:
-            ticket_num = int(ticket_num_item.text())
-        except ValueError:
+            ticket_num = int(self.table_model.ticket_number(row))
+        except (TypeError, ValueError):
+            QMessageBox.warning(self, "Erreur", "Ticket invalide.")
+            return
+        ticket_data = self.ticket_service.get_ticket(ticket_num)
+        if ticket_data is None:
             QMessageBox.warning(self, "Erreur", "Ticket invalide.")
             return
-        df = self.ticket_service.df
-        ticket_data = df[df["N°"] == ticket_num].iloc[0].to_dict()
         dialog = EditTicketDialog(self.ticket_service, ticket_data, parent=self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.ticket_service.load_tickets()
-            self.load_table()
+        dialog.exec_()
 
     def delete_ticket(self):
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "Avertissement", "Veuillez sélectionner un ticket à supprimer.")
             return
-        row = selected_items[0].row()
-        ticket_num_item = self.table.item(row, 0)
+        row = selected_rows[0].row()
         try:
-            ticket_num = int(ticket_num_item.text())
-        except ValueError:
+            ticket_num = int(self.table_model.ticket_number(row))
+        except (TypeError, ValueError):
             QMessageBox.warning(self, "Erreur", "Ticket invalide.")
             return
         reply = QMessageBox.question(
@@ -283,10 +638,55 @@ class MainWindow(QMainWindow):
         )
         if reply == QMessageBox.Yes:
             self.ticket_service.delete_ticket(ticket_num)
-            self.ticket_service.load_tickets()
-            self.load_table()
+
+    def export_excel(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter vers Excel", "", "Classeur Excel (*.xlsx)")
+        if not path:
+            return
+        try:
+            self.ticket_service.export_excel(path)
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur", f"Export impossible : {e}")
+
+    def closeEvent(self, event):
+        # Les modifications en attente sont écrites avant la fermeture ; si l'écriture
+        # échoue, la fenêtre reste ouverte à moins que l'utilisateur ne les abandonne
+        if not self.flush_before_close():
+            event.ignore()
+            return
+        self.save_state_timer.stop()
+        if self.instrumentation is not None:
+            self.latency_timer.stop()
+        if self.on_config_changed in self.registry.listeners:
+            self.registry.listeners.remove(self.on_config_changed)
+        self.ticket_service.close()
+        super().closeEvent(event)
+
+    def flush_before_close(self):
+        # Renvoie False si la fermeture doit être annulée
+        writer = self.ticket_service.writer
+        if writer is None:
+            return True
+        while True:
+            writer.flush()
+            if self.ticket_service.save_state() != "error":
+                return True
+            reply = QMessageBox.warning(
+                self, "Enregistrement impossible",
+                f"Les dernières modifications n'ont pas pu être enregistrées : {writer.last_error}\n"
+                "Réessayer (par exemple après avoir fermé le classeur dans Excel), annuler la "
+                "fermeture, ou quitter en abandonnant ces modifications ?",
+                QMessageBox.Retry | QMessageBox.Cancel | QMessageBox.Discard, QMessageBox.Retry
+            )
+            if reply != QMessageBox.Retry:
+                return reply == QMessageBox.Discard
+
+    def changeEvent(self, event):
+        # Au retour sur la fenêtre, relecture des tickets modifiés par d'autres postes
+        super().changeEvent(event)
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.sync_from_disk()
 
     def showEvent(self, event):
         super().showEvent(event)
-        self.table.resizeRowsToContents()
         self.table.repaint()
\ No newline at end of file
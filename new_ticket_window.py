@@ -1,19 +1,17 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QLineEdit, QTextEdit, QComboBox, QPushButton, QMessageBox
-import json
 
 class NewTicketDialog(QDialog):
-    def __init__(self, ticket_service, config_path="config.json", parent=None):
+    def __init__(self, ticket_service, parent=None):
         super().__init__(parent)
         self.ticket_service = ticket_service
         self.setWindowTitle("Nouveau Ticket")
         self.resize(500, 300)
 
-        with open(config_path, "r", encoding="utf-8") as f:
-            self.config = json.load(f)
-
-        self.programmes = self.config.get("programmes", [])
-        self.statuts = self.config.get("statuts", [])
-        self.priorites = self.config.get("priorites", [])
+        # Valeurs autorisées lues dans le schéma partagé (config.json n'est pas relu)
+        schema = ticket_service.schema
+        self.programmes = schema.allowed_values("Programme")
+        self.statuts = schema.allowed_values("Statut")
+        self.priorites = schema.allowed_values("Priorité")
 
         layout = QVBoxLayout()
         form_layout = QFormLayout()
@@ -55,5 +53,12 @@ class NewTicketDialog(QDialog):
             QMessageBox.warning(self, "Erreur", "Veuillez remplir tous les champs requis.")
             return
 
-        self.ticket_service.add_ticket(nom, programme, description, statut, priorite)
+        try:
+            self.ticket_service.add_ticket(nom, programme, description, statut, priorite)
+        except OSError as e:
+            # Numéro de ticket non attribué (verrou du partage non obtenu à temps, fichier
+            # ".seq" ou serveur d'API injoignable) : rien n'a été ajouté, la saisie est
+            # conservée pour un nouvel essai
+            QMessageBox.warning(self, "Erreur", f"Le ticket n'a pas pu être enregistré : {e}")
+            return
         self.accept()
\ No newline at end of file
@@ -0,0 +1,108 @@
+from PyQt5.QtCore import QObject, QTimer, QEvent
+from PyQt5.QtWidgets import QHeaderView
+
+
+# Hauteurs des lignes de la table, calculées à la demande au lieu de
+# resizeRowsToContents() (qui met en page le texte de toutes les lignes à chaque
+# rafraîchissement) :
+# - la hauteur d'un ticket est mémorisée avec l'empreinte de ses textes renvoyés à la
+#   ligne (Description, Nom) ; elle n'est recalculée que si le ticket est modifié ;
+# - le cache est vidé quand la largeur d'une de ces colonnes change ;
+# - les lignes visibles sont traitées immédiatement, les autres par lots lorsque
+#   l'application est inactive.
+class RowHeightCache(QObject):
+    # Lignes traitées par lot en tâche de fond
+    BATCH_ROWS = 200
+
+    def __init__(self, table, model, wrapped_columns, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self.model = model
+        self.header = table.verticalHeader()
+        self.wrapped = [model.columns.index(col) for col in wrapped_columns]
+        # numéro de ticket -> (empreinte des textes, hauteur)
+        self._heights = {}
+        # Largeurs des colonnes renvoyées à la ligne pour lesquelles le cache est valable
+        self._widths = {col: table.columnWidth(col) for col in self.wrapped}
+        # Prochaine ligne à traiter par le calcul en tâche de fond
+        self._next_row = 0
+
+        self.header.setSectionResizeMode(QHeaderView.Interactive)
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(0)
+        self._visible_timer.timeout.connect(self.update_visible_rows)
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(0)
+        self._idle_timer.timeout.connect(self.process_batch)
+
+        model.modelReset.connect(self.restart)
+        model.layoutChanged.connect(self.restart)
+        model.rowsInserted.connect(lambda parent, first, last: self.update_rows(first, last))
+        model.dataChanged.connect(lambda top_left, bottom_right, roles=(): self.update_rows(top_left.row(), bottom_right.row()))
+        table.verticalScrollBar().valueChanged.connect(self._visible_timer.start)
+        table.horizontalHeader().sectionResized.connect(self.on_section_resized)
+        table.viewport().installEventFilter(self)
+
+    def restart(self):
+        # Toutes les lignes sont à reprendre (filtrage, tri, rechargement) ; les
+        # hauteurs déjà connues sont reprises du cache
+        self._next_row = 0
+        self._visible_timer.start()
+        self._idle_timer.start()
+
+    def on_section_resized(self, column, old_size, new_size):
+        # La nouvelle largeur est prise dans le signal : pendant l'étirement de la
+        # colonne Description, columnWidth() renvoie encore l'ancienne valeur
+        if column in self._widths and self._widths[column] != new_size:
+            self._widths[column] = new_size
+            self._heights = {}
+            self.restart()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Resize, QEvent.Show):
+            self._visible_timer.start()
+        return False
+
+    def update_visible_rows(self):
+        # Calcule les lignes affichées, de la première visible jusqu'au bas de la vue
+        # (les hauteurs changeant au fur et à mesure, la fin est déterminée en avançant)
+        row_count = self.model.rowCount()
+        row = self.table.rowAt(0)
+        if row < 0:
+            return
+        available = self.table.viewport().height()
+        used = self.table.rowViewportPosition(row)
+        while row < row_count and used < available:
+            self.apply(row)
+            used += self.header.sectionSize(row)
+            row += 1
+
+    def update_rows(self, first, last):
+        for row in range(max(first, 0), min(last, self.model.rowCount() - 1) + 1):
+            self.apply(row)
+
+    def process_batch(self):
+        row_count = self.model.rowCount()
+        end = min(self._next_row + self.BATCH_ROWS, row_count)
+        for row in range(self._next_row, end):
+            self.apply(row)
+        self._next_row = end
+        if end >= row_count:
+            self._idle_timer.stop()
+
+    def apply(self, row):
+        height = self.height_for_row(row)
+        if self.header.sectionSize(row) != height:
+            self.header.resizeSection(row, height)
+
+    def height_for_row(self, row):
+        number = self.model.ticket_number(row)
+        key = hash(tuple(self.model.display_text(row, col) for col in self.wrapped))
+        cached = self._heights.get(number)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        # Même hauteur minimale que le redimensionnement automatique de QHeaderView
+        height = max(self.table.sizeHintForRow(row), self.header.minimumSectionSize())
+        self._heights[number] = (key, height)
+        return height
@@ -0,0 +1,101 @@
+import bisect
+import re
+import unicodedata
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def fold_text(text):
+    # Minuscules et suppression des accents : "Fermé" -> "ferme"
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+
+# Index inversé : mot (sans accents, en minuscules) -> numéros des tickets qui le contiennent.
+# Construit une fois au chargement puis tenu à jour ticket par ticket.
+class TokenIndex:
+    def __init__(self):
+        self._postings = {}
+        self._tokens_by_ticket = {}
+        # Liste triée des mots, reconstruite à la demande pour la recherche par préfixe
+        self._sorted_tokens = None
+
+    def build(self, ticket_numbers, texts):
+        self._postings = {}
+        self._tokens_by_ticket = {}
+        self._sorted_tokens = None
+        for ticket_number, text in zip(ticket_numbers, texts):
+            self.add(ticket_number, text)
+
+    def add(self, ticket_number, text):
+        if text is None or (isinstance(text, float) and text != text):
+            return
+        tokens = set(tokenize(text))
+        if not tokens:
+            return
+        self._tokens_by_ticket[ticket_number] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = {ticket_number}
+                self._sorted_tokens = None
+            else:
+                postings.add(ticket_number)
+
+    def remove(self, ticket_number):
+        for token in self._tokens_by_ticket.pop(ticket_number, ()):
+            postings = self._postings[token]
+            postings.discard(ticket_number)
+            if not postings:
+                del self._postings[token]
+                self._sorted_tokens = None
+
+    def update(self, ticket_number, text):
+        self.remove(ticket_number)
+        self.add(ticket_number, text)
+
+    def search(self, query):
+        # Tous les mots de la requête doivent être présents ; le dernier mot est
+        # recherché comme préfixe tant que la saisie ne se termine pas par un espace.
+        # Renvoie None si la requête ne contient aucun mot.
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        prefix = None
+        if not query[-1:].isspace():
+            prefix = tokens.pop()
+
+        postings = []
+        for token in set(tokens):
+            found = self._postings.get(token)
+            if not found:
+                return set()
+            postings.append(found)
+        if prefix is not None:
+            found = self._prefix_postings(prefix)
+            if not found:
+                return set()
+            postings.append(found)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for found in postings[1:]:
+            result &= found
+            if not result:
+                break
+        return result
+
+    def _prefix_postings(self, prefix):
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        found = set()
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            found |= self._postings[token]
+        return found
@@ -0,0 +1,52 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+# Incrémenté si le format des instantanés change (les anciens sont alors ignorés)
+SNAPSHOT_FORMAT = 1
+
+
+def default_cache_dir():
+    # Dossier local à l'utilisateur : l'instantané n'est jamais lu depuis un partage réseau
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "my_jira_dcgf")
+
+
+# Instantané binaire (pickle) du DataFrame lu dans le classeur Excel.
+# Il est associé à la date de modification et à la taille du classeur : tant que
+# celles-ci n'ont pas changé, le chargement lit l'instantané au lieu du .xlsx.
+class SnapshotCache:
+    def __init__(self, source_path, cache_dir=None):
+        self.source_path = source_path
+        cache_dir = cache_dir or default_cache_dir()
+        # Un instantané par classeur, nommé d'après son chemin absolu
+        digest = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"{digest}.snapshot.pkl")
+
+    def load(self, signature):
+        # Renvoie le DataFrame si l'instantané correspond à la signature du classeur, sinon None
+        if signature is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            print("Instantané illisible, relecture du classeur :", e)
+            return None
+        if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("signature") != signature:
+            return None
+        return snapshot["df"]
+
+    def save(self, signature, df):
+        if signature is None:
+            return
+        snapshot = {"format": SNAPSHOT_FORMAT, "signature": signature, "df": df}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(self.path))
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print("Impossible d'écrire l'instantané :", e)
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+from PyQt5.QtCore import QObject, QEvent
+
+
+# Rapport des temps de démarrage (imports, premier affichage, lecture des tickets).
+# Activé par la variable d'environnement DCGF_STARTUP_TIMING=1 ou par la clé
+# "startup_timing" de config.json ; le rapport est écrit sur la sortie d'erreur.
+class StartupTimer(QObject):
+    def __init__(self, start, enabled=False, parent=None):
+        super().__init__(parent)
+        self.start = start
+        self.enabled = enabled or os.environ.get("DCGF_STARTUP_TIMING") == "1"
+        self.marks = []
+        self._window = None
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def attach(self, window):
+        # Mesure le premier affichage de la fenêtre puis la fin du remplissage de la table
+        if not self.enabled:
+            return
+        self._window = window
+        window.installEventFilter(self)
+        window.tickets_loaded.connect(self._on_tickets_loaded)
+
+    def eventFilter(self, obj, event):
+        if obj is self._window and event.type() == QEvent.Paint:
+            self.mark("premier affichage de la fenêtre")
+            self._window.removeEventFilter(self)
+        return False
+
+    def _on_tickets_loaded(self):
+        self.mark("tickets affichés")
+        loader = self._window.loader
+        lines = ["Temps de démarrage :"]
+        for label, elapsed in self.marks:
+            lines.append(f"  {label:<40} {elapsed * 1000:8.1f} ms")
+        if loader is not None:
+            storage = self._window.ticket_service.storage
+            source = "instantané" if getattr(storage, "loaded_from_snapshot", False) else "fichier"
+            lines.append(f"  {'dont import de pandas':<40} {loader.import_time * 1000:8.1f} ms")
+            lines.append(f"  {'dont lecture des tickets (' + source + ')':<40} {loader.load_time * 1000:8.1f} ms")
+        print("\n".join(lines), file=sys.stderr)
@@ -0,0 +1,100 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from ticket_stats import STAT_COLUMNS
+
+# Libellé des lignes et colonnes de totaux
+TOTAL = "Total"
+
+
+# Tableau croisé Programme × Priorité (lignes) / Statut (colonnes), lu dans les
+# compteurs de TicketStatistics et rafraîchi à chaque modification des tickets.
+# Un double-clic sur une cellule applique le filtre correspondant dans la fenêtre principale.
+class StatisticsDialog(QDialog):
+    # {colonne: valeur} des critères de la cellule double-cliquée
+    filter_requested = pyqtSignal(dict)
+
+    def __init__(self, statistics, ticket_service, parent=None):
+        super().__init__(parent)
+        self.statistics = statistics
+        self.ticket_service = ticket_service
+        self.setWindowTitle("Statistiques")
+        self.resize(600, 450)
+
+        layout = QVBoxLayout()
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
+        layout.addWidget(self.table)
+        # Tickets archivés non chargés (non comptés)
+        self.archive_label = QLabel()
+        self.archive_label.setStyleSheet("color: #555;")
+        layout.addWidget(self.archive_label)
+        self.setLayout(layout)
+
+        # Plusieurs notifications successives (import, synchronisation) : un seul rafraîchissement
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(200)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        schema = self.ticket_service.schema
+        programmes = self.statistics.values("Programme", schema.allowed_values("Programme"))
+        statuts = self.statistics.values("Statut", schema.allowed_values("Statut"))
+        priorites = self.statistics.values("Priorité", schema.allowed_values("Priorité"))
+        headers = ["Programme", "Priorité"] + [statut or "(vide)" for statut in statuts] + [TOTAL]
+        # Critères (programme, priorité) de chaque ligne ; None : toutes les valeurs
+        self.row_criteria = [(programme, priorite) for programme in programmes for priorite in priorites + [None]]
+        self.row_criteria.append((None, None))
+        self.column_statuts = statuts + [None]
+
+        self.table.clear()
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setRowCount(len(self.row_criteria))
+        bold = QFont(self.table.font())
+        bold.setBold(True)
+        for row, (programme, priorite) in enumerate(self.row_criteria):
+            labels = [programme or "(vide)", priorite or "(vide)"]
+            if programme is None:
+                labels = [TOTAL, ""]
+            elif priorite is None:
+                labels[1] = TOTAL
+            for col, text in enumerate(labels):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+            for offset, statut in enumerate(self.column_statuts):
+                count = self.statistics.count(programme, statut, priorite)
+                item = QTableWidgetItem(str(count) if count else "")
+                item.setTextAlignment(Qt.AlignCenter)
+                self.table.setItem(row, 2 + offset, item)
+            if priorite is None:
+                for col in range(len(headers)):
+                    self.table.item(row, col).setFont(bold)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+
+        done, total = self.ticket_service.archive_progress()
+        if total > done:
+            self.archive_label.setText(f"Archives non chargées : {total - done} tickets ne sont pas comptés.")
+        else:
+            self.archive_label.setText("")
+
+    def on_cell_double_clicked(self, row, col):
+        programme, priorite = self.row_criteria[row]
+        statut = self.column_statuts[col - 2] if col >= 2 else None
+        values = dict(zip(STAT_COLUMNS, (programme, statut, priorite)))
+        self.filter_requested.emit({column: value or "" for column, value in values.items()})
+
+    # Les compteurs ne sont suivis que tant que la fenêtre est affichée
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.statistics.listeners.append(self.refresh_timer.start)
+        self.refresh()
+
+    def hideEvent(self, event):
+        self.statistics.listeners.remove(self.refresh_timer.start)
+        self.refresh_timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS = ["N°", "Nom", "Programme", "Description", "Statut", "Priorité"]
+
+# Configuration minimale : classeur Excel, écritures immédiates, sans archives ni journal
+BASE_CONFIG = {
+    "excel_path": "suivi_jira_dcgf.xlsx",
+    "storage": "excel",
+    "write_behind": False,
+    "snapshot_cache": False,
+    "archive": False,
+    "journal": False,
+    "programmes": ["RAFALE", "AVSIMAR", "M2000"],
+    "statuts": ["Ouvert", "Fermé"],
+    "priorites": ["P1", "P2", "P3"],
+    "saved_filters": {}
+}
+
+
+def ticket(number, nom, statut="Ouvert", programme="RAFALE", priorite="P1", description="desc"):
+    return {"N°": number, "Nom": nom, "Programme": programme, "Description": description,
+            "Statut": statut, "Priorité": priorite}
+
+
+def write_workbook(path, tickets):
+    import pandas as pd
+    pd.DataFrame(tickets, columns=COLUMNS).to_excel(path, index=False, engine="openpyxl")
+
+
+@pytest.fixture(scope="session")
+def app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def process_events(app, seconds):
+    # Laisse tourner la boucle d'événements Qt (minuteries) pendant "seconds" secondes
+    import time
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def make_service(workdir):
+    # make_service(**clés de config.json) : TicketService sur un dossier temporaire
+    services = []
+
+    def make(**config):
+        from ticket_service import TicketService
+        with open("config.json", "w", encoding="utf-8") as f:
+            json.dump(dict(BASE_CONFIG, **config), f)
+        service = TicketService()
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.close()
@@ -0,0 +1,100 @@
+import json
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from conftest import COLUMNS, ticket, write_workbook
+from ticket_storage import HttpStorage
+
+
+@pytest.fixture
+def api_url(make_service):
+    from api_server import TicketApiServer
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un"), ticket(2, "deux")])
+    service = make_service()
+    service.enable_write_behind()
+    server = TicketApiServer(service)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    ports = []
+
+    def run():
+        asyncio.set_event_loop(loop)
+        ports.append(loop.run_until_complete(server.start(port=0)))
+        started.set()
+        loop.run_forever()
+        # Fin de la tâche d'écriture annulée par stop()
+        loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop), return_exceptions=True))
+        loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(10)
+    yield f"http://127.0.0.1:{ports[0]}"
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+
+
+def call(url, method, path, body=None, headers=None):
+    # (statut, en-têtes, contenu JSON) ; les statuts d'erreur ne lèvent pas d'exception
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url + path, data=data, method=method, headers=dict(headers or {}))
+    if data is not None:
+        request.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            status, response_headers, payload = response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        status, response_headers, payload = e.code, e.headers, e.read()
+    return status, response_headers, json.loads(payload) if payload else None
+
+
+def test_if_match_refuses_stale_updates(api_url):
+    status, headers, data = call(api_url, "GET", "/tickets/1")
+    assert status == 200 and data["Nom"] == "un"
+    etag = headers["ETag"]
+    assert call(api_url, "GET", "/tickets/1", headers={"If-None-Match": etag})[0] == 304
+
+    status, headers, data = call(api_url, "PATCH", "/tickets/1", {"nom": "un modifié"}, {"If-Match": etag})
+    assert status == 200 and data["Nom"] == "un modifié"
+    assert headers["ETag"] != etag
+
+    # Modification faite à partir de la version périmée : refusée, rien n'est écrit
+    status, _, data = call(api_url, "PATCH", "/tickets/1", {"statut": "Fermé"}, {"If-Match": etag})
+    assert status == 412
+    assert call(api_url, "GET", "/tickets/1")[2]["Statut"] == "Ouvert"
+    assert call(api_url, "DELETE", "/tickets/2", headers={"If-Match": etag})[0] == 412
+    assert list(pd.read_excel("suivi_jira_dcgf.xlsx")["Nom"]) == ["un modifié", "deux"]
+
+
+def test_create_validates_values_and_is_written_before_the_reply(api_url):
+    status, _, data = call(api_url, "POST", "/tickets", {"nom": "trois", "description": "d", "statut": "En cours"})
+    assert status == 400 and "Statut" in data["error"]
+
+    status, headers, data = call(api_url, "POST", "/tickets", {"nom": "trois", "description": "d", "priorite": "P2"})
+    assert status == 201 and headers["Location"] == f"/tickets/{data['N°']}"
+    assert data["Programme"] == "RAFALE"
+    assert list(pd.read_excel("suivi_jira_dcgf.xlsx")["Nom"]) == ["un", "deux", "trois"]
+
+    status, _, data = call(api_url, "GET", "/tickets?nom=tro")
+    assert status == 200 and [t["Nom"] for t in data["tickets"]] == ["trois"]
+
+
+def test_http_storage_round_trip(api_url):
+    storage = HttpStorage(api_url, COLUMNS)
+    assert list(storage.load(COLUMNS)["Nom"]) == ["un", "deux"]
+    assert not storage.changed_on_disk()
+
+    first = storage.allocate(count=2)
+    assert first == 3
+    storage.write_changes(None, [ticket(first, "trois")], [1])
+    assert list(storage.load(COLUMNS)["N°"]) == [2, 3]
+
+    # Écriture d'un autre client : relevée par la requête conditionnelle
+    HttpStorage(api_url, COLUMNS).write_changes(None, [ticket(4, "quatre")], [])
+    assert storage.changed_on_disk()
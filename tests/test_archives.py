@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import ticket, write_workbook
+
+
+@pytest.fixture(params=["excel", "sqlite"])
+def archived_service(request, make_service):
+    # 10 tickets fermés (archives) et 2 ouverts ; les fermés sont déplacés au chargement
+    tickets = [ticket(n, f"t{n}", statut="Fermé") for n in range(1, 11)]
+    tickets += [ticket(11, "t11"), ticket(12, "t12")]
+    write_workbook("suivi_jira_dcgf.xlsx", tickets)
+    if request.param == "sqlite":
+        # Premier lancement : reprise du classeur dans la base
+        make_service(storage="sqlite", archive=True)
+    return make_service(storage=request.param, archive=True)
+
+
+def test_archive_pages_survive_reopen_between_pages(archived_service):
+    service = archived_service
+    assert sorted(service.df["N°"]) == [11, 12]
+    assert service.load_archive_page(3) == 3
+    assert sorted(service.df["N°"]) == [1, 2, 3, 11, 12]
+
+    # Ticket rouvert entre deux pages : il quitte les archives
+    service.update_ticket(2, "t2", "RAFALE", "desc", "Ouvert", "P1")
+    while not service.archives_complete:
+        assert service.load_archive_page(3) > 0
+    assert sorted(service.df["N°"]) == list(range(1, 13))
+    assert service.archive_progress() == (9, 9)
+
+
+def test_archive_pages_pick_up_tickets_closed_elsewhere(archived_service, make_service):
+    service = archived_service
+    service.load_archive_page(5)
+    service.load_archive_page(5)
+    assert service.archives_complete
+
+    # Un autre poste clôt le ticket 11, de numéro inférieur au dernier numéro lu
+    other = make_service(storage=service.config["storage"], archive=True)
+    other.update_ticket(11, "t11", "RAFALE", "desc", "Fermé", "P1")
+    service.sync_from_disk()
+    service.delete_ticket(12)
+    while not service.archives_complete:
+        assert service.load_archive_page(5) > 0
+    assert sorted(service.df["N°"]) == list(range(1, 12))
+
+
+def test_archive_count_is_kept_up_to_date_without_rereading(archived_service, monkeypatch):
+    service = archived_service
+    archive = service.storage.archive
+    assert service.archive_progress() == (0, 10)
+
+    reads = []
+    count = archive.count
+    monkeypatch.setattr(archive, "count", lambda: reads.append(1) or count())
+    service.load_archive_page(3)
+    service.update_ticket(11, "t11", "RAFALE", "desc", "Fermé", "P1")  # clos : archivé
+    service.update_ticket(2, "t2", "RAFALE", "desc", "Ouvert", "P1")   # rouvert
+    service.update_ticket(3, "t3 modifié", "RAFALE", "desc", "Fermé", "P1")
+    service.delete_ticket(1)
+    assert service.archive_progress() == (2, 9)
+    assert not reads
+
+    # Relecture des tickets actifs : les archives sont recomptées
+    service.load_tickets()
+    assert service.archive_progress() == (0, 9)
+    assert len(reads) == 1
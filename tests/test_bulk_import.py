@@ -0,0 +1,26 @@
+import bulk_import
+
+
+def test_import_rejects_values_outside_config_lists(make_service, capsys):
+    make_service().close()
+    with open("tickets.csv", "w", encoding="utf-8") as f:
+        f.write("Nom;Programme;Description;Statut;Priorité\n"
+                "un;RAFALE;desc;Ouvert;P1\n"
+                "deux;A400M;desc;Ouvert;P1\n"
+                "trois;M2000;desc;En cours;P2\n"
+                "quatre;M2000;desc;Fermé;P9\n"
+                ";M2000;desc;Fermé;P2\n"
+                "six;;desc;;\n")
+
+    assert bulk_import.main(["tickets.csv"]) == 1
+    output = capsys.readouterr().out
+    assert "Enregistrement 2 ignoré : Valeur non autorisée pour Programme : A400M" in output
+    assert "Enregistrement 3 ignoré : Valeur non autorisée pour Statut : En cours" in output
+    assert "Enregistrement 4 ignoré : Valeur non autorisée pour Priorité : P9" in output
+    assert "Enregistrement 5 ignoré : Le champ Nom est obligatoire." in output
+    assert "4 enregistrements ignorés" in output
+
+    # Colonnes vides : premières valeurs des listes de config.json
+    service = make_service()
+    assert list(service.df["Nom"]) == ["un", "six"]
+    assert service.get_ticket(2)["Programme"] == "RAFALE"
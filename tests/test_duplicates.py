@@ -0,0 +1,28 @@
+from conftest import ticket, write_workbook
+
+
+def test_lookups_agree_on_duplicated_number(make_service):
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un"), ticket(2, "deux"), ticket(2, "deux bis")])
+    service = make_service()
+    assert service.positions_of([2]) == {2: service.position_of(2)} == {2: 2}
+
+    # La fenêtre de modification lit un ticket puis enregistre cette même ligne
+    shown = service.get_ticket(2)
+    assert shown["Nom"] == "deux bis"
+    service.update_ticket(2, "modifié", "RAFALE", "desc", "Ouvert", "P2", expected=shown)
+    assert list(service.df["Nom"]) == ["un", "deux", "modifié"]
+    import pandas as pd
+    assert list(pd.read_excel("suivi_jira_dcgf.xlsx")["Nom"]) == ["un", "deux", "modifié"]
+
+
+def test_delete_removes_every_row_of_duplicated_number(make_service):
+    write_workbook("suivi_jira_dcgf.xlsx",
+                   [ticket(1, "un"), ticket(2, "deux"), ticket(2, "deux bis"), ticket(3, "trois")])
+    service = make_service()
+    removed = []
+    service.subscribe(lambda change: removed.append(change.position) if change.kind == "removed" else None)
+    service.delete_ticket(2)
+    assert list(service.df["N°"]) == [1, 3]
+    assert service.get_ticket(2) is None
+    # Positions décroissantes : chacune reste valable au moment de sa notification
+    assert removed == [2, 1]
@@ -0,0 +1,23 @@
+from conftest import ticket, write_workbook
+from ticket_filter import TicketFilter
+
+
+def test_indexed_search_maps_hits_back_to_positions(make_service):
+    tickets = [ticket(1, "Dupont", description="erreur connexion serveur"),
+               ticket(2, "Martin", description="imprimante bloquée"),
+               ticket(None, "Durand", description="erreur connexion"),
+               ticket(4, "Dupond", description="connexion lente", statut="Fermé")]
+    write_workbook("suivi_jira_dcgf.xlsx", tickets)
+    service = make_service()
+    ticket_filter = TicketFilter(service, exact_columns=["Statut"])
+
+    # Ligne sans numéro (position 2) : absente des résultats de l'index, sans erreur
+    assert list(ticket_filter.filter({"Description": "conn"})) == [0, 3]
+    assert list(ticket_filter.filter({"Description": "connexion"})) == [0, 3]
+    assert list(ticket_filter.filter({"Description": "erreur conn"})) == [0]
+    assert list(ticket_filter.filter({"Description": "connexion", "Statut": "fermé"})) == [3]
+    assert list(ticket_filter.filter({"Nom": "dupon"})) == [0, 3]
+
+    # Après une modification, les numéros de la colonne "N°" sont relus
+    service.update_ticket(2, "Martin", "RAFALE", "connexion impossible", "Ouvert", "P1")
+    assert list(ticket_filter.filter({"Description": "connexion"})) == [0, 1, 3]
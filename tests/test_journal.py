@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+
+from conftest import COLUMNS, ticket, write_workbook
+from ticket_storage import ExcelStorage, JournaledStorage, replay
+
+
+def test_write_behind_keeps_every_journal_entry(make_service):
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un")])
+    service = make_service(journal=True, write_behind=True, write_behind_interval=60)
+    number = service.add_ticket("deux", "RAFALE", "desc", "Ouvert", "P1")
+    service.update_ticket(number, "deux", "RAFALE", "desc", "Ouvert", "P2")
+    service.update_ticket(number, "deux", "RAFALE", "desc", "Fermé", "P2")
+    # Les trois modifications sont écrites ensemble, mais chacune garde sa ligne
+    service.writer.flush()
+
+    history = service.ticket_history(number)
+    assert [entry["op"] for entry in history] == ["upsert"] * 3
+    assert [(entry["ticket"]["Priorité"], entry["ticket"]["Statut"]) for entry in history] == [
+        ("P1", "Ouvert"), ("P2", "Ouvert"), ("P2", "Fermé")
+    ]
+
+
+def test_replay_keeps_last_entry_of_each_ticket():
+    df = pd.DataFrame([ticket(1, "un"), ticket(2, "deux")], columns=COLUMNS)
+    entries = [
+        {"op": "upsert", "ticket": ticket(3, "trois")},
+        {"op": "upsert", "ticket": ticket(1, "un modifié")},
+        {"op": "delete", "N°": 2},
+        {"op": "upsert", "ticket": ticket(3, "trois modifié")},
+    ]
+    result = replay(df, entries)
+    assert list(result["Nom"]) == ["un modifié", "trois modifié"]
+    # Rejouer des lignes déjà fusionnées ne change rien
+    assert replay(result, entries).equals(result)
+
+
+def test_journal_is_replayed_then_compacted_into_the_workbook(workdir):
+    write_workbook("t.xlsx", [ticket(1, "un"), ticket(2, "deux")])
+    storage = JournaledStorage(ExcelStorage("t.xlsx"), COLUMNS, compact_entries=1000)
+    storage.load(COLUMNS)
+    storage.write_changes(None, [ticket(1, "un modifié")], [])
+    storage.write_changes(None, [ticket(3, "trois")], [2])
+
+    # Le classeur n'est pas réécrit ; un autre poste relit classeur et journal
+    assert list(pd.read_excel("t.xlsx")["Nom"]) == ["un", "deux"]
+    other = JournaledStorage(ExcelStorage("t.xlsx"), COLUMNS)
+    assert list(other.load(COLUMNS)["Nom"]) == ["un modifié", "trois"]
+
+    # Ligne tronquée par un arrêt brutal : ignorée au chargement
+    with open(storage.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "upsert", "ticket": {"N°": 4')
+    assert list(other.load(COLUMNS)["N°"]) == [1, 3]
+
+    assert storage.compact()
+    assert list(pd.read_excel("t.xlsx")["Nom"]) == ["un modifié", "trois"]
+    assert not os.path.exists(storage.journal_path)
+    assert other.changed_on_disk()
+    assert list(other.load(COLUMNS)["Nom"]) == ["un modifié", "trois"]
+    # Les lignes fusionnées restent dans l'historique
+    assert [entry["op"] for entry in storage.history(2)] == ["delete"]
+    assert [entry["ticket"]["Nom"] for entry in storage.history(1)] == ["un modifié"]
@@ -0,0 +1,105 @@
+import time
+
+import pandas as pd
+
+from conftest import process_events, ticket, write_workbook
+
+
+def displayed_numbers(window):
+    model = window.table_model
+    return sorted(int(model.ticket_number(row)) for row in range(model.rowCount()))
+
+
+def test_merged_changes_from_another_poste_reach_the_table(app, make_service):
+    from main_window import MainWindow
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un")])
+    service = make_service()
+    window = MainWindow(service)
+    # Seule la fusion lors de l'enregistrement doit déclencher la relecture
+    window.file_watcher.fileChanged.disconnect()
+    try:
+        time.sleep(0.01)
+        write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un"), ticket(5, "autre poste")])
+        number = service.add_ticket("nouveau", "RAFALE", "desc", "Ouvert", "P1")
+        assert service.storage.external_changes
+        process_events(app, 1.5)
+        assert displayed_numbers(window) == sorted([1, 5, number])
+    finally:
+        window.close()
+
+
+def test_new_ticket_dialog_stays_open_when_no_number_can_be_allocated(app, make_service, monkeypatch):
+    from PyQt5.QtWidgets import QMessageBox
+    from new_ticket_window import NewTicketDialog
+    service = make_service()
+
+    def allocate(count=1, floor=0):
+        raise TimeoutError("Verrou non obtenu : suivi_jira_dcgf.xlsx.seq.lock")
+
+    warnings = []
+    monkeypatch.setattr(service.allocator, "allocate", allocate)
+    monkeypatch.setattr(QMessageBox, "warning", lambda parent, title, text: warnings.append(text))
+    dialog = NewTicketDialog(service)
+    dialog.nom_edit.setText("nouveau")
+    dialog.description_edit.setPlainText("desc")
+    dialog.save_ticket()
+
+    assert dialog.result() != dialog.Accepted
+    assert "Verrou non obtenu" in warnings[0]
+    assert len(service.df) == 0
+
+
+def test_close_is_cancelled_when_pending_changes_cannot_be_written(app, make_service, monkeypatch):
+    from PyQt5.QtWidgets import QMessageBox
+    from main_window import MainWindow
+    service = make_service(write_behind=True, write_behind_interval=60)
+    window = MainWindow(service)
+    number = service.add_ticket("nouveau", "RAFALE", "desc", "Ouvert", "P1")
+
+    write_changes = service.storage.write_changes
+
+    def locked(df, upserts, deletes):
+        raise PermissionError("classeur ouvert dans Excel")
+
+    def retry():
+        # Le classeur a été libéré entre-temps
+        monkeypatch.setattr(service.storage, "write_changes", write_changes)
+        return QMessageBox.Retry
+
+    replies = [lambda: QMessageBox.Cancel, retry]
+    monkeypatch.setattr(service.storage, "write_changes", locked)
+    monkeypatch.setattr(QMessageBox, "warning", lambda *args: replies.pop(0)())
+
+    # Annuler : la fenêtre reste ouverte, la modification toujours en attente
+    assert not window.close()
+    assert service.save_state() == "error"
+
+    # Réessayer : la fenêtre se ferme, le ticket est écrit
+    assert window.close()
+    assert not replies
+    assert list(pd.read_excel("suivi_jira_dcgf.xlsx")["N°"]) == [number]
+
+
+def test_instrumentation_times_the_save_not_the_dialog(app, make_service, monkeypatch):
+    from PyQt5.QtWidgets import QDialog
+    from main_window import MainWindow
+    service = make_service(instrumentation=True, instrumentation_dir="profiling")
+    window = MainWindow(service)
+
+    def exec_(dialog):
+        # L'utilisateur reste dans la fenêtre avant d'enregistrer
+        time.sleep(0.3)
+        dialog.nom_edit.setText("nouveau")
+        dialog.description_edit.setPlainText("desc")
+        dialog.save_ticket()
+        return QDialog.Accepted
+
+    monkeypatch.setattr("new_ticket_window.NewTicketDialog.exec_", exec_)
+    try:
+        window.open_new_ticket()
+        histograms = service.instrumentation.histograms
+        assert "MainWindow.open_new_ticket" not in histograms
+        assert histograms["TicketService.add_ticket"].to_dict()["max_ms"] < 300
+        assert service.instrumentation.last[0] == "TicketService.add_ticket"
+    finally:
+        window.close()
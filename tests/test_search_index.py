@@ -0,0 +1,37 @@
+from search_index import TokenIndex, tokenize
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Accès refusé, MOT-de-passe") == ["acces", "refuse", "mot", "de", "passe"]
+
+
+def test_search_matches_every_word_with_last_word_as_prefix():
+    index = TokenIndex()
+    index.build([1, 2, 3], ["Erreur de connexion au serveur", "Connexion lente", None])
+
+    assert index.search("conn") == {1, 2}
+    assert index.search("connexion serv") == {1}
+    # Saisie terminée par une espace : dernier mot complet, plus de préfixe
+    assert index.search("conn ") == set()
+    assert index.search("SERVEUR erreur") == {1}
+    assert index.search("imprimante") == set()
+    assert index.search("  ,; ") is None
+
+
+def test_add_update_remove_keep_postings_in_step():
+    index = TokenIndex()
+    index.build([1], ["imprimante bloquée"])
+    index.add(2, "imprimante réseau")
+    assert index.search("imprim") == {1, 2}
+    # Nouveau mot après une recherche par préfixe (liste triée reconstruite)
+    index.update(1, "écran noir")
+    assert index.search("imprim") == {2}
+    assert index.search("ecran") == {1}
+    assert index.search("bloq") == set()
+
+    index.remove(2)
+    assert index.search("imprim") == set()
+    assert index.search("reseau") == set()
+    # Ticket absent de l'index : sans effet
+    index.remove(42)
+    assert index.search("noir") == {1}
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from conftest import COLUMNS, ticket, write_workbook
+from ticket_storage import SQLiteStorage
+
+
+def test_save_load_and_write_changes_round_trip(workdir):
+    storage = SQLiteStorage("t.db", COLUMNS)
+    storage.save_all(pd.DataFrame([ticket(2, "deux"), ticket(1, "un", description=None)], columns=COLUMNS))
+    df = storage.load(COLUMNS)
+    # Lus par numéro croissant ; cellule vide relue vide
+    assert list(df["N°"]) == [1, 2]
+    assert df["Description"].isna().tolist() == [True, False]
+
+    storage.write_changes(None, [ticket(2, "deux modifié"), ticket(3, "trois")], [1])
+    assert list(storage.load(COLUMNS)["Nom"]) == ["deux modifié", "trois"]
+    assert storage.count() == 2
+    assert list(storage.load_after(COLUMNS, after=2, limit=5)["N°"]) == [3]
+    storage.close()
+
+
+def test_changes_from_another_connection_are_detected(workdir):
+    storage = SQLiteStorage("t.db", COLUMNS)
+    other = SQLiteStorage("t.db", COLUMNS)
+    storage.load(COLUMNS)
+    # Nos propres écritures ne comptent pas comme une modification externe
+    storage.write_changes(None, [ticket(1, "un")], [])
+    assert not storage.changed_on_disk()
+    other.write_changes(None, [ticket(2, "deux")], [])
+    assert storage.changed_on_disk()
+    storage.close()
+    other.close()
+
+
+def test_service_imports_the_workbook_then_keeps_changes_in_the_database(make_service):
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un"), ticket(2, "deux")])
+    service = make_service(storage="sqlite")
+    assert list(service.df["Nom"]) == ["un", "deux"]
+    number = service.add_ticket("trois", "M2000", "desc", "Ouvert", "P2")
+    service.update_ticket(1, "un modifié", "RAFALE", "desc", "Fermé", "P1")
+    service.delete_ticket(2)
+    service.close()
+
+    reopened = make_service(storage="sqlite")
+    assert list(reopened.df["N°"]) == [1, number]
+    assert reopened.get_ticket(1)["Statut"] == "Fermé"
+    # Le classeur d'origine n'est pas modifié
+    assert list(pd.read_excel("suivi_jira_dcgf.xlsx")["Nom"]) == ["un", "deux"]
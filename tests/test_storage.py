@@ -0,0 +1,21 @@
+import pandas as pd
+
+from conftest import COLUMNS, ticket, write_workbook
+from ticket_storage import ExcelStorage, apply_changes
+
+
+def test_apply_changes_with_duplicated_number():
+    df = pd.DataFrame([ticket(1, "un"), ticket(2, "deux"), ticket(2, "deux bis"), ticket(3, "trois")],
+                      columns=COLUMNS)
+    result = apply_changes(df, [ticket(2, "deux modifié"), ticket(4, "quatre")], [3])
+    # Seule la dernière ligne du N° 2 est remplacée ; la première est conservée
+    assert list(result["N°"]) == [1, 2, 2, 4]
+    assert list(result["Nom"]) == ["un", "deux", "deux modifié", "quatre"]
+
+
+def test_write_changes_on_workbook_with_duplicated_number(workdir):
+    write_workbook("t.xlsx", [ticket(1, "un"), ticket(1, "un bis"), ticket(2, "deux")])
+    storage = ExcelStorage("t.xlsx")
+    storage.load(COLUMNS)
+    storage.write_changes(None, [ticket(1, "un modifié")], [2])
+    assert list(pd.read_excel("t.xlsx")["Nom"]) == ["un", "un modifié"]
@@ -0,0 +1,42 @@
+import time
+
+from conftest import ticket, write_workbook
+
+
+def test_sync_from_disk_with_duplicated_number(make_service):
+    # Classeur d'avant l'attribution des numéros sous verrou : deux tickets N° 2
+    tickets = [ticket(1, "un"), ticket(2, "deux"), ticket(2, "deux bis"), ticket(3, "trois")]
+    write_workbook("suivi_jira_dcgf.xlsx", tickets)
+    service = make_service()
+    assert len(service.df) == 4
+
+    # Un autre poste modifie le ticket 3 et ajoute le ticket 4
+    time.sleep(0.01)
+    write_workbook("suivi_jira_dcgf.xlsx", tickets[:3] + [ticket(3, "trois modifié"), ticket(4, "quatre")])
+    assert service.sync_from_disk()
+
+    assert service.get_ticket(3)["Nom"] == "trois modifié"
+    assert service.get_ticket(4)["Nom"] == "quatre"
+    assert sorted(service.df["Nom"]) == ["deux", "deux bis", "quatre", "trois modifié", "un"]
+
+
+def test_dataframe_is_published_once_typed_and_indexed(make_service, monkeypatch):
+    from search_index import TokenIndex
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(1, "un", description="erreur connexion")])
+    service = make_service()
+    service.df = None
+
+    # Ce que verrait l'interface (sans verrou) pendant le chargement
+    seen = []
+    build = TokenIndex.build
+
+    def watched_build(index, numbers, texts):
+        seen.append(service.loaded)
+        build(index, numbers, texts)
+
+    monkeypatch.setattr(TokenIndex, "build", watched_build)
+    service.load_tickets(notify=False)
+
+    assert seen == [False, False]
+    assert str(service.df["Statut"].dtype) == "category"
+    assert service.search("Description", "conn") == {1}
@@ -0,0 +1,35 @@
+import time
+
+import numpy as np
+
+from conftest import ticket, write_workbook
+
+
+def assert_same_arrays(model, df):
+    for patched, expected in zip(model._arrays, model._column_arrays(df)):
+        assert list(patched) == list(expected)
+
+
+def test_patched_arrays_follow_ticket_changes(app, make_service):
+    from ticket_table_model import TicketTableModel
+    tickets = [ticket(1, "un"), ticket(2, "deux"), ticket(2, "deux bis"), ticket(3, "trois"), ticket(4, "quatre")]
+    write_workbook("suivi_jira_dcgf.xlsx", tickets)
+    service = make_service()
+    model = TicketTableModel(service.schema)
+    model.set_dataframe(service.df)
+    service.subscribe(lambda change: model.patch_arrays(service.df, change.kind, change.position))
+
+    number = service.add_ticket("cinq", "M2000", "desc", "Ouvert", "P3")
+    service.update_ticket(3, "trois modifié", "AVSIMAR", "autre", "Fermé", "P2")
+    assert_same_arrays(model, service.df)
+    # Numéro en double : deux lignes supprimées
+    service.delete_ticket(2)
+    assert_same_arrays(model, service.df)
+
+    # Synchronisation : suppression, modification et ajout notifiés ensemble
+    time.sleep(0.01)
+    write_workbook("suivi_jira_dcgf.xlsx", [ticket(3, "trois"), ticket(4, "quatre modifié", priorite="P3"),
+                                            dict(service.get_ticket(number)), ticket(6, "six")])
+    assert service.sync_from_disk()
+    assert_same_arrays(model, service.df)
+    assert list(np.asarray(model._arrays[0])) == [3, 4, number, 6]
@@ -0,0 +1,156 @@
+import numpy as np
+
+
+# Moteur de filtrage des tickets.
+# - les colonnes sont converties une seule fois en texte minuscule, puis gardées
+#   en cache tant que le TicketService n'a pas été modifié (compteur "version") ;
+# - la recherche est littérale (pas d'expression régulière) ;
+# - les colonnes munies d'un index plein texte dans le TicketService (Description,
+#   Nom) sont interrogées via TicketService.search() plutôt que parcourues ;
+# - quand une saisie prolonge la précédente (ex. "ferm" -> "fermé"), seules les
+#   lignes du résultat précédent sont réexaminées ;
+# - les colonnes exactes de type "category" sont comparées par code entier.
+class TicketFilter:
+    def __init__(self, ticket_service, exact_columns=()):
+        self.ticket_service = ticket_service
+        # Colonnes comparées par égalité (valeurs issues des listes déroulantes)
+        self.exact_columns = set(exact_columns)
+        # Critères appliqués lors du dernier appel à filter() (textes normalisés)
+        self.criteria = {}
+        self._version = None
+        self._lowered = {}
+        self._codes = {}
+        self._numbers = None
+        self._last_criteria = None
+        self._last_positions = None
+
+    def invalidate(self):
+        self._version = None
+        self._lowered = {}
+        self._codes = {}
+        self._numbers = None
+        self._last_criteria = None
+        self._last_positions = None
+
+    def lowered_column(self, column):
+        self._check_version()
+        values = self._lowered.get(column)
+        if values is None:
+            df = self.ticket_service.df
+            values = df[column].astype("string").fillna("").str.lower().to_numpy(dtype=object)
+            self._lowered[column] = values
+        return values
+
+    def ticket_numbers(self):
+        # Colonne "N°" en flottants (NaN pour un numéro vide), pour comparer les
+        # positions aux numéros trouvés par un index plein texte sans boucle Python
+        self._check_version()
+        if self._numbers is None:
+            self._numbers = self.ticket_service.df["N°"].to_numpy(dtype="float64", na_value=np.nan)
+        return self._numbers
+
+    def category_codes(self, column):
+        # (codes de chaque ligne, {libellé en minuscules: code}) pour une colonne
+        # de type "category", sinon None
+        self._check_version()
+        if column not in self._codes:
+            series = self.ticket_service.df[column]
+            if str(series.dtype) == "category":
+                code_of = {str(label).lower(): code for code, label in enumerate(series.cat.categories)}
+                self._codes[column] = (series.cat.codes.to_numpy(), code_of)
+            else:
+                self._codes[column] = None
+        return self._codes[column]
+
+    def filter(self, criteria):
+        # criteria : {colonne: texte}, les textes vides sont ignorés.
+        # Renvoie les positions (dans le DataFrame) des lignes correspondantes.
+        import pandas as pd
+        self._check_version()
+        criteria = self._normalize(criteria)
+        self.criteria = criteria
+        previous = self._last_criteria
+        if previous is not None and self._narrows(previous, criteria):
+            positions = self._last_positions
+        else:
+            previous = {}
+            positions = np.arange(len(self.ticket_service.df), dtype=np.int64)
+
+        for column, text in criteria.items():
+            if len(positions) == 0:
+                break
+            if previous.get(column) == text:
+                # Critère inchangé : déjà satisfait par le résultat précédent
+                continue
+            if column in self.ticket_service.search_indexes:
+                found = self.ticket_service.search(column, text)
+                if found is None:
+                    continue
+                # Numéros vides (pd.NA) écartés : ils ne correspondent à aucune ligne
+                found = np.fromiter((n for n in found if n is not pd.NA), dtype="float64")
+                positions = positions[np.isin(self.ticket_numbers()[positions], found)]
+                continue
+            if column in self.exact_columns:
+                categories = self.category_codes(column)
+                if categories is not None:
+                    codes, code_of = categories
+                    positions = positions[codes[positions] == code_of.get(text, -2)]  # -2 : aucun code
+                    continue
+            values = self.lowered_column(column)[positions]
+            if column in self.exact_columns:
+                mask = values == text
+            else:
+                mask = np.fromiter((text in value for value in values), dtype=bool, count=len(values))
+            positions = positions[mask]
+
+        self._last_criteria = criteria
+        self._last_positions = positions
+        return positions
+
+    def matches(self, position):
+        # Vrai si la ligne à cette position satisfait les critères courants
+        # (utilisé pour répercuter un ajout ou une modification sans refiltrer)
+        import pandas as pd
+        df = self.ticket_service.df
+        for column, text in self.criteria.items():
+            if column in self.ticket_service.search_indexes:
+                found = self.ticket_service.search(column, text)
+                if found is not None and df["N°"].iat[position] not in found:
+                    return False
+                continue
+            value = df[column].iat[position]
+            value = "" if pd.isna(value) else str(value).lower()
+            if column in self.exact_columns:
+                if value != text:
+                    return False
+            elif text not in value:
+                return False
+        return True
+
+    def _normalize(self, criteria):
+        return {
+            col: text.lower() if col in self.ticket_service.search_indexes else text.strip().lower()
+            for col, text in criteria.items() if text and text.strip()
+        }
+
+    def _check_version(self):
+        if self._version != self.ticket_service.version:
+            self.invalidate()
+            self._version = self.ticket_service.version
+
+    def _narrows(self, previous, criteria):
+        # Vrai si chaque critère précédent est conservé ou prolongé
+        for column, old_text in previous.items():
+            new_text = criteria.get(column)
+            if new_text is None:
+                return False
+            if column in self.exact_columns:
+                if new_text != old_text:
+                    return False
+            elif column in self.ticket_service.search_indexes:
+                # Recherche par mots : seule une saisie prolongée restreint le résultat
+                if not new_text.startswith(old_text):
+                    return False
+            elif old_text not in new_text:
+                return False
+        return True
@@ -0,0 +1,36 @@
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+# Chargement des tickets dans un thread séparé : la fenêtre principale s'affiche
+# immédiatement, affiche les premières lignes dès qu'elles sont lues (signal
+# "preview") puis la table complète lorsque le chargement est terminé.
+class TicketLoader(QThread):
+    loaded = pyqtSignal()
+    # (lignes lues, nombre total de lignes ; 0 si inconnu)
+    progress = pyqtSignal(int, int)
+    # DataFrame des premières lignes lues (colonnes non typées)
+    preview = pyqtSignal(object)
+
+    def __init__(self, ticket_service, parent=None):
+        super().__init__(parent)
+        self.ticket_service = ticket_service
+        # Durées mesurées (en secondes), reprises dans le rapport de démarrage
+        self.import_time = None
+        self.load_time = None
+
+    def run(self):
+        start = time.perf_counter()
+        import pandas  # noqa: F401  (import coûteux, fait ici plutôt qu'au lancement)
+        self.import_time = time.perf_counter() - start
+        start = time.perf_counter()
+        # La notification "reset" est envoyée par la fenêtre, dans le thread de l'interface
+        self.ticket_service.load_tickets(notify=False, on_progress=self.report_progress)
+        self.load_time = time.perf_counter() - start
+        self.loaded.emit()
+
+    def report_progress(self, rows_read, total_rows, preview):
+        # Appelée dans ce thread ; les signaux sont reçus dans le thread de l'interface
+        if preview is not None:
+            self.preview.emit(preview)
+        self.progress.emit(rows_read, total_rows)
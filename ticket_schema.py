@@ -0,0 +1,148 @@
+import os
+import json
+import threading
+from collections import namedtuple
+
+# Description d'une colonne des tickets :
+# kind : "number" (N°), "category" (valeurs énumérées) ou "text" (texte libre) ;
+# values_key : liste de config.json donnant les valeurs autorisées (colonnes "category") ;
+# width : largeur dans la table ; stretch : la colonne occupe la place restante ;
+# filter_width : largeur du champ de filtre ; colors : couleur de fond par valeur ;
+# centered : contenu centré ; wrapped : texte renvoyé à la ligne (hauteur des lignes).
+Column = namedtuple("Column", [
+    "name", "kind", "values_key", "width", "stretch", "filter_width", "colors", "centered", "wrapped"
+])
+
+COLUMNS = (
+    Column("N°", "number", None, 50, False, 50, {}, True, False),
+    Column("Nom", "text", None, 120, False, 120, {}, False, True),
+    Column("Programme", "category", "programmes", 100, False, 150, {}, False, False),
+    Column("Description", "text", None, 400, True, 200, {}, False, True),
+    Column("Statut", "category", "statuts", 80, False, 150,
+           {"Ouvert": "#82E0AA", "Fermé": "#F1948A"}, False, False),
+    Column("Priorité", "category", "priorites", 60, False, 150,
+           {"P1": "#85C1E9", "P2": "#F8C471", "P3": "#E74C3C"}, True, False),
+)
+
+# Attributs modifiables par colonne dans la clé "columns" de config.json, ex. :
+# "columns": {"Statut": {"width": 100, "colors": {"Ouvert": "#82E0AA"}}}
+OVERRIDABLE = ("width", "filter_width", "colors")
+
+
+# Schéma des colonnes, construit une fois par lecture de config.json : la table, les
+# filtres, les fenêtres et le TicketService y lisent les types, valeurs autorisées,
+# largeurs et couleurs au lieu de les redéfinir chacun.
+class TicketSchema:
+    def __init__(self, config):
+        overrides = config.get("columns", {})
+        self.columns = []
+        for column in COLUMNS:
+            values = overrides.get(column.name, {})
+            self.columns.append(column._replace(**{key: values[key] for key in OVERRIDABLE if key in values}))
+        self.names = [column.name for column in self.columns]
+        self._by_name = {column.name: column for column in self.columns}
+        # Valeurs autorisées des colonnes "category", dans l'ordre de config.json
+        self._values = {
+            column.name: [str(value) for value in config.get(column.values_key, [])]
+            for column in self.columns if column.kind == "category"
+        }
+        self.category_columns = tuple(self._values)
+        self.text_columns = tuple(column.name for column in self.columns if column.kind == "text")
+        self.wrapped_columns = tuple(column.name for column in self.columns if column.wrapped)
+
+    def column(self, name):
+        return self._by_name[name]
+
+    def allowed_values(self, name):
+        return list(self._values.get(name, []))
+
+    def check(self, values, partial=False):
+        # Contrôle d'un ticket saisi ailleurs que dans les fenêtres (API, import en masse),
+        # comme dans la fenêtre "Nouveau Ticket" : valeurs des listes de config.json, Nom
+        # et Description requis (partial : seuls les champs fournis sont contrôlés).
+        # Renvoie le message d'erreur, ou None si le ticket est valide.
+        for column in self.category_columns:
+            allowed = self._values[column]
+            if column in values and allowed and values[column] not in allowed:
+                return f"Valeur non autorisée pour {column} : {values[column]}"
+        for column in self.text_columns:
+            if (column in values or not partial) and not values.get(column):
+                return f"Le champ {column} est obligatoire."
+        return None
+
+
+# Configuration (config.json) et schéma partagés : le fichier est lu une seule fois,
+# puis relu uniquement lorsqu'il a changé (voir reload). Les fonctions de "listeners"
+# sont appelées (sans argument) après chaque relecture ayant changé la configuration.
+class ConfigRegistry:
+    def __init__(self, path):
+        self.path = path
+        self.listeners = []
+        self.config = {}
+        self.schema = None
+        self._signature = None
+        self._lock = threading.RLock()
+        self._read()
+
+    def signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed_on_disk(self):
+        return self.signature() != self._signature
+
+    def reload(self):
+        # Relit config.json s'il a été modifié ; renvoie True si la configuration a changé.
+        # Un fichier illisible (en cours d'écriture par un éditeur) est ignoré.
+        with self._lock:
+            if not self.changed_on_disk():
+                return False
+            previous = self.config
+            try:
+                self._read()
+            except (OSError, ValueError) as e:
+                print("Erreur lors de la relecture de la configuration :", e)
+                return False
+            if self.config == previous:
+                return False
+        for listener in list(self.listeners):
+            listener()
+        return True
+
+    def update(self, **values):
+        # Enregistre les clés données dans config.json (ex. "saved_filters"), en
+        # conservant les autres clés telles qu'elles sont dans le fichier
+        with self._lock:
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            config.update(values)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(config, f, ensure_ascii=False, indent=4)
+            os.replace(temp_path, self.path)
+        self.reload()
+
+    def _read(self):
+        signature = self.signature()
+        with open(self.path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.schema = TicketSchema(config)
+        self.config = config
+        self._signature = signature
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path="config.json"):
+    # Registre partagé par tous les utilisateurs d'un même fichier de configuration
+    key = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ConfigRegistry(key)
+        return registry
@@ -1,64 +1,721 @@
 import os
-import json
-import pandas as pd
+import atexit
+import threading
+from collections import namedtuple
 
+from concurrency import TicketNumberAllocator
+from instrumentation import Instrumentation, instrumentation_enabled
+from search_index import TokenIndex
+from ticket_schema import get_registry
+from ticket_storage import ExcelStorage, HttpStorage, JournaledStorage, PartitionedStorage, create_storage
+from write_behind import WriteBehindWriter
+
+# Notification envoyée aux abonnés après chaque modification des tickets.
+# kind : "inserted", "updated", "removed" ou "reset" (rechargement complet) ;
+# position : position de la ligne dans le DataFrame (avant suppression pour "removed") ;
+# old / new : valeurs du ticket avant et après la modification (dictionnaires ou None).
+TicketChange = namedtuple("TicketChange", ["kind", "ticket_number", "position", "old", "new"])
+
+# Au-delà de ce nombre de tickets modifiés en une fois (import en masse,
+# synchronisation avec un autre poste), les abonnés reçoivent une seule
+# notification "reset" plutôt qu'une notification par ticket
+RESET_THRESHOLD = 200
+
+# Nombre de tickets archivés lus par page (voir TicketService.load_archive_page)
+ARCHIVE_PAGE_SIZE = 1000
+
+# Opérations chronométrées lorsque l'instrumentation est activée
+INSTRUMENTED_OPERATIONS = (
+    "load_tickets", "sync_from_disk", "save_tickets", "write_changes", "search",
+    "import_excel", "export_excel", "add_ticket", "update_ticket", "delete_ticket",
+    "add_tickets", "update_tickets", "put_tickets", "delete_tickets", "load_archive_page", "load_archives"
+)
+INSTRUMENTED_STORAGE_OPERATIONS = ("load", "save_all", "write_changes")
+
+
+class TicketConflictError(Exception):
+    # Le ticket a été modifié par un autre poste depuis qu'il a été lu
+    pass
+
+
+# pandas n'est importé qu'au premier chargement des tickets, pour que la fenêtre
+# principale puisse s'afficher avant ce chargement (voir main.py).
 class TicketService:
-    def __init__(self, config_path="config.json"):
-        with open(config_path, "r", encoding="utf-8") as f:
-            self.config = json.load(f)
-        self.file_path = self.config.get("excel_path", "suivi_jira_dcgf.xlsx")
-        self.columns = ["N°", "Nom", "Programme", "Description", "Statut", "Priorité"]
-        self.load_tickets()
-
-    def load_tickets(self):
-        if os.path.exists(self.file_path):
+    def __init__(self, config_path="config.json", autoload=True):
+        # Configuration et schéma des colonnes partagés avec les fenêtres (lus une fois,
+        # relus lorsque config.json change)
+        self.registry = get_registry(config_path)
+        self.registry.reload()
+        self.config_path = self.registry.path
+        self.columns = list(self.schema.names)
+        # Moteur de stockage (classeur Excel ou base SQLite) choisi dans config.json
+        self.storage = create_storage(self.config, self.columns)
+        self.file_path = self.storage.path
+        # Numéros de ticket attribués sous verrou, partagés entre tous les postes
+        # (par le serveur d'API en mode "http")
+        if self.remote:
+            self.allocator = self.storage
+        else:
+            self.allocator = TicketNumberAllocator(self.file_path + ".seq")
+        # Incrémenté à chaque modification du DataFrame (sert à invalider les caches)
+        self.version = 0
+        # Index plein texte (mot -> numéros de tickets) des colonnes recherchables
+        self.search_indexes = {"Description": TokenIndex(), "Nom": TokenIndex()}
+        # Protège le DataFrame lorsqu'il est lu par le thread d'enregistrement différé
+        self.lock = threading.RLock()
+        # Fonctions appelées avec un TicketChange après chaque modification
+        self.listeners = []
+        # Enregistrement différé : les écritures sur disque sont faites en arrière-plan
+        self.writer = None
+        if self.config.get("write_behind", False):
+            self.enable_write_behind()
+        # DataFrame des tickets ; None tant que load_tickets() n'a pas été appelé
+        self.df = None
+        # Plus grand numéro de ticket connu (évite de recalculer le max à chaque ajout)
+        self._max_number = 0
+        # Plus grand numéro lu dans les archives (pagination par clé de la partition
+        # archivée, voir ticket_storage.PartitionedStorage) ; None : parcours à commencer
+        self._archive_after = None
+        # Mesure des durées des opérations (None si désactivée)
+        self.instrumentation = None
+        if instrumentation_enabled(self.config):
+            self.instrumentation = Instrumentation(self.config.get("instrumentation_dir", "profiling"))
+            self.instrumentation.wrap(self, INSTRUMENTED_OPERATIONS, "TicketService")
+            self.instrumentation.wrap(self.storage, INSTRUMENTED_STORAGE_OPERATIONS, "stockage")
+        if autoload:
+            self.load_tickets()
+
+    @property
+    def config(self):
+        return self.registry.config
+
+    @property
+    def schema(self):
+        return self.registry.schema
+
+    @property
+    def loaded(self):
+        return self.df is not None
+
+    @property
+    def remote(self):
+        # Vrai lorsque les tickets sont lus et écrits via le serveur d'API
+        return isinstance(self.storage, HttpStorage)
+
+    @property
+    def archive_enabled(self):
+        return isinstance(self.storage, PartitionedStorage)
+
+    @property
+    def archived_status(self):
+        # Statut des tickets rangés dans les archives (None sans partitionnement)
+        return self.storage.archived_status if self.archive_enabled else None
+
+    def enable_write_behind(self):
+        # Active l'enregistrement différé (clé "write_behind", ou imposé par le serveur d'API).
+        # Avec le journal, chaque modification y garde sa propre ligne : pas de regroupement.
+        if self.writer is None:
+            self.writer = WriteBehindWriter(self, self.config.get("write_behind_interval", 2.0),
+                                            coalesce=not self.config.get("journal", False))
+            atexit.register(self.close)
+
+    def save_config(self, **values):
+        # Enregistre les clés données dans config.json (ex. "saved_filters")
+        self.registry.update(**values)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, kind, ticket_number=None, position=None, old=None, new=None):
+        change = TicketChange(kind, ticket_number, position, old, new)
+        for listener in list(self.listeners):
+            listener(change)
+
+    def load_tickets(self, notify=True, on_progress=None):
+        # notify=False permet un chargement depuis un autre thread : l'appelant
+        # envoie ensuite lui-même la notification "reset" depuis le thread de l'interface.
+        # on_progress(lignes lues, total, aperçu) suit la lecture du fichier (voir
+        # ticket_storage.read_excel_streaming) ; self.df n'est remplacé qu'à la fin.
+        with self.lock:
+            self._load_tickets(on_progress)
+        if notify:
+            self.notify("reset")
+
+    def sync_from_disk(self):
+        # Relit le fichier s'il a été modifié par un autre poste et n'applique que
+        # les tickets ajoutés, modifiés ou supprimés par celui-ci. Les tickets
+        # modifiés localement et pas encore enregistrés sont conservés.
+        if not self.loaded or not self.storage.exists():
+            return False
+        if not self.storage.external_changes and not self.storage.changed_on_disk():
+            return False
+        with self.lock:
             try:
-                self.df = pd.read_excel(self.file_path, engine='openpyxl')
+                disk_df = self.apply_schema(self.storage.load(self.columns))
             except Exception as e:
                 print("Erreur lors du chargement du fichier :", e)
-                self.df = pd.DataFrame(columns=self.columns)
+                return False
+            pending = self.writer.pending_numbers() if self.writer is not None else set()
+            if self.archive_enabled:
+                # Les tickets archivés chargés en mémoire ne sont pas dans le fichier relu
+                pending |= self.storage.archived_numbers()
+            inserted, updated, removed = self._diff_with(disk_df, pending)
+            if len(inserted) + len(updated) + len(removed) > RESET_THRESHOLD:
+                self._replace_with(disk_df, pending)
+                changes = None
+            else:
+                changes = self._remove_rows(removed)
+                changes += self._update_rows(updated)
+                changes += self._insert_rows(inserted)
+        self._notify_changes(changes)
+        return True
+
+    # Le DataFrame est indexé par N° (la colonne "N°" est conservée) : les recherches
+    # par numéro passent par la table de hachage de l'index au lieu d'un parcours.
+
+    # Numéro en double (classeur d'avant l'attribution sous verrou) : la dernière ligne
+    # fait référence, pour la lecture comme pour l'écriture (voir aussi apply_changes).
+
+    def positions_of(self, ticket_numbers):
+        # {numéro: position} pour les numéros présents dans le DataFrame
+        ticket_numbers = list(ticket_numbers)
+        index = self.df.index
+        if index.is_unique:
+            found = index.get_indexer(ticket_numbers)
+            return {number: int(position) for number, position in zip(ticket_numbers, found) if position >= 0}
+        # Numéros en double dans le fichier : recherche par parcours de la colonne
+        # (les positions étant croissantes, la dernière occurrence l'emporte)
+        numbers = self.df["N°"]
+        hits = numbers.isin(ticket_numbers).to_numpy().nonzero()[0]
+        return {numbers.iat[position]: int(position) for position in hits}
+
+    def position_of(self, ticket_number):
+        # Position de la ligne du ticket dans le DataFrame, ou None
+        try:
+            location = self.df.index.get_loc(ticket_number)
+        except (KeyError, TypeError):
+            return None
+        if isinstance(location, int):
+            return location
+        # Numéro en double (tranche ou masque) : dernière occurrence, comme positions_of
+        positions = (self.df["N°"] == ticket_number).to_numpy().nonzero()[0]
+        return int(positions[-1]) if len(positions) else None
+
+    def ticket_at(self, position):
+        # Les valeurs manquantes (pd.NA, NaN) sont renvoyées sous forme de None
+        import pandas as pd
+        ticket = {}
+        for col in self.columns:
+            value = self.df[col].iat[position]
+            ticket[col] = None if pd.isna(value) else value
+        return ticket
+
+    def get_ticket(self, ticket_number):
+        # Valeurs du ticket (dictionnaire), ou None s'il n'existe pas
+        position = self.position_of(ticket_number)
+        return self.ticket_at(position) if position is not None else None
+
+    def _load_tickets(self, on_progress=None):
+        import pandas as pd
+        if self.writer is not None:
+            # Les modifications encore en attente doivent être sur disque avant de relire
+            self.writer.flush()
+        self.version += 1
+        self._archive_after = None
+        excel_path = self.config.get("excel_path", "suivi_jira_dcgf.xlsx")
+        # Le DataFrame lu reste local jusqu'à rebuild_indexes() : l'interface (qui lit
+        # self.df sans verrou) ne voit jamais un DataFrame non typé ou sans index
+        if self.storage.exists():
+            try:
+                df = self.storage.load(self.columns, on_progress)
+            except Exception as e:
+                print("Erreur lors du chargement du fichier :", e)
+                df = pd.DataFrame(columns=self.columns)
+        elif os.path.abspath(self.file_path) != os.path.abspath(excel_path) and os.path.exists(excel_path):
+            # Première utilisation d'un autre moteur : reprise du classeur Excel existant
+            # (et de son journal des modifications)
+            self._import_excel(excel_path, journal=self.config.get("journal", False))
+            return
         else:
-            self.df = pd.DataFrame(columns=self.columns)
-            self.save_tickets()
+            df = pd.DataFrame(columns=self.columns)
+            try:
+                if not self.storage.create(df):
+                    # Fichier créé au même moment par un autre poste : on le lit
+                    df = self.storage.load(self.columns)
+            except Exception as e:
+                print("Erreur lors de la sauvegarde du fichier :", e)
+        self.rebuild_indexes(df)
+
+    def rebuild_indexes(self, df):
+        # Après un chargement complet : types des colonnes, index N° du DataFrame,
+        # compteur du plus grand numéro connu et index plein texte, calculés à part ;
+        # df ne remplace self.df qu'une fois tout prêt
+        import pandas as pd
+        df = self.apply_schema(df)
+        df.index = pd.Index(df["N°"].to_numpy())
+        max_number = 0
+        if not df.empty:
+            try:
+                max_number = int(df["N°"].max())
+            except Exception:
+                max_number = 0
+        search_indexes = {column: TokenIndex() for column in self.search_indexes}
+        for column, index in search_indexes.items():
+            index.build(df["N°"], df[column].to_numpy(dtype=object, na_value=None))
+        with self.lock:
+            self.df = df
+            self._max_number = max_number
+            self.search_indexes = search_indexes
+
+    # -- Schéma des colonnes --
+    # read_excel renvoie des colonnes "object" (et parfois un N° flottant). Les colonnes
+    # sont converties à chaque chargement : N° en entier nullable, colonnes énumérées en
+    # "category" (un code entier par ligne au lieu d'une chaîne), texte libre en "string".
+
+    def apply_schema(self, df):
+        import pandas as pd
+        df = df.copy()
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = None
+        numbers = pd.to_numeric(df["N°"], errors="coerce")
+        try:
+            df["N°"] = numbers.astype("Int64")
+        except (TypeError, ValueError):
+            # Numéros non entiers dans le fichier : conservés tels quels
+            df["N°"] = numbers
+        for col in self.schema.category_columns:
+            df[col] = pd.Categorical(df[col].astype("string"), categories=self._categories(col, df[col]))
+        for col in self.schema.text_columns:
+            df[col] = df[col].astype("string")
+        return df
+
+    def _categories(self, column, values):
+        # Valeurs de config.json, suivies de celles rencontrées dans les données
+        categories = self.schema.allowed_values(column)
+        known = set(categories)
+        if hasattr(values, "cat"):
+            values = values.cat.categories
+        extra = sorted({str(value) for value in values.dropna().unique()} - known)
+        return categories + extra
+
+    def _conform(self, tickets):
+        # DataFrame des tickets donnés, avec les types de self.df ; les catégories
+        # de self.df sont complétées par les valeurs nouvelles
+        import pandas as pd
+        rows = pd.DataFrame(tickets, columns=self.columns)
+        for col in self.schema.category_columns:
+            values = self._category_values(rows[col])
+            self._add_categories(col, values)
+            rows[col] = pd.Categorical(values, categories=self.df[col].cat.categories)
+        rows["N°"] = rows["N°"].astype(self.df["N°"].dtype)
+        for col in self.schema.text_columns:
+            rows[col] = rows[col].astype("string")
+        return rows
+
+    def _category_values(self, values):
+        # Valeurs sous forme de texte, les cellules vides devenant None
+        return [self._cell_text(value) or None for value in values]
+
+    def _add_categories(self, column, values):
+        categories = self.df[column].cat.categories
+        new = sorted({value for value in values if value is not None} - set(categories))
+        if new:
+            self.df[column] = self.df[column].cat.add_categories(new)
+
+    def search(self, column, query):
+        # Numéros des tickets dont la colonne contient tous les mots de la requête
+        # (accents ignorés, dernier mot en préfixe) ; None si la requête est vide
+        return self.search_indexes[column].search(query)
 
     def save_tickets(self):
+        if self.writer is not None:
+            self.writer.enqueue_full_save()
+            return
         try:
-            self.df.to_excel(self.file_path, index=False, engine='openpyxl')
+            self.storage.save_all(self.df)
         except Exception as e:
             print("Erreur lors de la sauvegarde du fichier :", e)
 
-    def add_ticket(self, nom, programme, description, statut, priorite):
-        if self.df.empty:
-            next_num = 1
-        else:
-            try:
-                next_num = int(self.df["N°"].max()) + 1
-            except Exception:
-                next_num = 1
+    def write_changes(self, upserts=(), deletes=()):
+        # Enregistre uniquement les tickets modifiés si le moteur le permet
+        if self.writer is not None:
+            self.writer.enqueue(upserts, deletes)
+            return
+        try:
+            self.storage.write_changes(self.df, list(upserts), list(deletes))
+        except Exception as e:
+            print("Erreur lors de la sauvegarde du fichier :", e)
+
+    def import_excel(self, path):
+        with self.lock:
+            self._import_excel(path)
+        self.notify("reset")
+
+    def _import_excel(self, path, journal=False):
+        import pandas as pd
+        # Remplace l'ensemble des tickets par le contenu d'un classeur Excel
+        self.version += 1
+        storage = ExcelStorage(path)
+        if journal:
+            storage = JournaledStorage(storage, self.columns, self.config.get("journal_compact_entries", 500))
+        try:
+            df = storage.load(self.columns)
+            storage.close()
+        except Exception as e:
+            print("Erreur lors de l'import du fichier :", e)
+            df = pd.DataFrame(columns=self.columns)
+        self.rebuild_indexes(df)
+        self.save_tickets()
+
+    def export_excel(self, path):
+        import pandas as pd
+        with self.lock:
+            df = self.df.copy()
+        if self.archive_enabled:
+            # L'export comprend aussi les archives qui n'ont pas été chargées, lues
+            # une fois les modifications en attente (suppressions comprises) écrites
+            if self.writer is not None:
+                self.writer.flush()
+            archives = self.storage.load_archive(self.columns)
+            archives = archives[~archives["N°"].isin(df["N°"])]
+            if not archives.empty:
+                df = pd.concat([df.astype(object), archives[self.columns]], ignore_index=True)
+        ExcelStorage(path).save_all(df)
+
+    # -- Archives (partition des tickets archivés, lue à la demande) --
+
+    def archive_progress(self):
+        # (tickets archivés présents en mémoire, nombre total de lignes d'archives)
+        if not self.archive_enabled:
+            return 0, 0
+        total = self.storage.count_archive()
+        return min(len(self.storage.archived_numbers()), total), total
+
+    @property
+    def archives_complete(self):
+        done, total = self.archive_progress()
+        return done >= total
+
+    def load_archive_page(self, page_size=ARCHIVE_PAGE_SIZE):
+        # Ajoute au DataFrame les tickets archivés suivants par numéro croissant
+        # (N° supérieur au dernier numéro lu), page_size=None : toutes les archives
+        # restantes ; renvoie le nombre de tickets ajoutés. Les archives changent entre
+        # deux pages (ticket rouvert, clos par un autre poste) : arrivé au bout alors que
+        # des tickets archivés manquent encore, le parcours reprend au début, les
+        # tickets déjà en mémoire étant ignorés.
+        import pandas as pd
+        if not self.archive_enabled or not self.loaded:
+            return 0
+        with self.lock:
+            frames = []
+            # Un parcours commencé au début n'a pas à être repris
+            restarted = self._archive_after is None
+            while True:
+                try:
+                    frame = self.storage.load_archive(self.columns, self._archive_after, page_size)
+                except Exception as e:
+                    print("Erreur lors du chargement des archives :", e)
+                    break
+                numbers = frame["N°"].dropna()
+                if len(numbers):
+                    self._archive_after = int(numbers.max())
+                frame = frame[~frame["N°"].isin(self.df.index)]
+                self.storage.mark_archived(frame["N°"])
+                frames.append(frame)
+                exhausted = page_size is None or len(numbers) < page_size
+                if not exhausted or restarted or self.archives_complete:
+                    break
+                self._archive_after = None
+                restarted = True
+            if not frames:
+                return 0
+            frame = pd.concat(frames, ignore_index=True).drop_duplicates("N°", keep="last")
+            changes = self._insert_frame(frame)
+        self._notify_changes(changes)
+        return len(frame)
+
+    def load_archives(self):
+        return self.load_archive_page(None)
+
+    def watched_paths(self):
+        # Fichiers modifiés par les enregistrements des autres postes : classeur ou
+        # base ("-wal" d'une base SQLite) et journal des modifications
+        paths = [self.file_path, self.file_path + "-wal"]
+        active = self.storage.active if self.archive_enabled else self.storage
+        if isinstance(active, JournaledStorage):
+            paths.append(active.journal_path)
+        return paths
+
+    def ticket_history(self, ticket_number):
+        # Modifications enregistrées dans le journal pour un ticket (actif ou archivé),
+        # de la plus ancienne à la plus récente ; vide sans journal ("journal": false)
+        storages = [self.storage.active, self.storage.archive] if self.archive_enabled else [self.storage]
+        entries = []
+        for storage in storages:
+            if isinstance(storage, JournaledStorage):
+                entries += storage.history(ticket_number)
+        return sorted(entries, key=lambda entry: entry.get("time", ""))
+
+    def save_state(self):
+        # "saved", "pending", "saving" ou "error" (toujours "saved" sans enregistrement différé)
+        if self.writer is None:
+            return WriteBehindWriter.SAVED
+        return self.writer.state
+
+    def close(self):
+        # Écrit les modifications en attente avant de libérer le stockage
+        if self.writer is not None:
+            self.writer.close()
+        self.storage.close()
+        if self.instrumentation is not None:
+            self.instrumentation.close()
 
-        new_ticket = {
-            "N°": next_num,
+    def next_ticket_number(self, count=1):
+        # Réserve "count" numéros consécutifs et renvoie le premier
+        floor = self._max_number
+        if self.archive_enabled and not os.path.exists(self.allocator.path):
+            # Première attribution : la séquence doit aussi dépasser les numéros des
+            # archives, qui ne sont pas toutes en mémoire
+            floor = max(floor, self.storage.max_archived_number())
+        first = self.allocator.allocate(count=count, floor=floor)
+        self._max_number = max(self._max_number, first + count - 1)
+        return first
+
+    def add_ticket(self, nom, programme, description, statut, priorite):
+        return self.add_tickets([{
             "Nom": nom,
             "Programme": programme,
             "Description": description,
             "Statut": statut,
             "Priorité": priorite
-        }
-
-        new_ticket_df = pd.DataFrame([new_ticket])
-        self.df = pd.concat([self.df, new_ticket_df], ignore_index=True)
-        self.save_tickets()
+        }])[0]
 
     def delete_ticket(self, ticket_number):
-        self.df = self.df[self.df["N°"] != ticket_number]
-        self.save_tickets()
+        self.delete_tickets([ticket_number])
+
+    def update_ticket(self, ticket_number, nom, programme, description, statut, priorite, expected=None):
+        # expected : valeurs du ticket telles qu'elles ont été lues (ex. à l'ouverture de
+        # la fenêtre de modification). Si le ticket a changé depuis, sur ce poste ou sur
+        # un autre, TicketConflictError est levée et rien n'est modifié.
+        if expected is not None:
+            self.sync_from_disk()
+        with self.lock:
+            position = self.position_of(ticket_number)
+            if position is None:
+                if expected is not None:
+                    raise TicketConflictError(f"Le ticket {ticket_number} a été supprimé.")
+                return
+            if expected is not None and not self._same_ticket(self.ticket_at(position), expected):
+                raise TicketConflictError(f"Le ticket {ticket_number} a été modifié entre-temps.")
+            self.update_tickets({ticket_number: {
+                "Nom": nom,
+                "Programme": programme,
+                "Description": description,
+                "Statut": statut,
+                "Priorité": priorite
+            }})
+
+    # -- Opérations en masse : une seule opération sur le DataFrame et une seule sauvegarde --
+
+    def add_tickets(self, records):
+        # records : dictionnaires {colonne: valeur} (sans "N°", attribué ici).
+        # Renvoie les numéros attribués, dans l'ordre des enregistrements.
+        records = list(records)
+        if not records:
+            return []
+        with self.lock:
+            first = self.next_ticket_number(len(records))
+            tickets = []
+            for i, record in enumerate(records):
+                ticket = {"N°": first + i}
+                ticket.update({col: record.get(col, "") for col in self.columns[1:]})
+                tickets.append(ticket)
+            changes = self._insert_rows(tickets)
+            self.write_changes(upserts=tickets)
+        self._notify_changes(changes)
+        return [ticket["N°"] for ticket in tickets]
+
+    def update_tickets(self, changes):
+        # changes : {numéro: {colonne: nouvelle valeur}} ; seules les colonnes fournies
+        # sont modifiées. Renvoie les numéros des tickets effectivement trouvés.
+        with self.lock:
+            positions = self.positions_of(changes)
+            tickets = []
+            for ticket_number, position in positions.items():
+                ticket = self.ticket_at(position)
+                ticket.update({col: value for col, value in changes[ticket_number].items() if col != "N°"})
+                tickets.append(ticket)
+            if not tickets:
+                return []
+            applied = self._update_rows(tickets)
+            self.write_changes(upserts=tickets)
+        self._notify_changes(applied)
+        return [ticket["N°"] for ticket in tickets]
+
+    def put_tickets(self, tickets):
+        # tickets : dictionnaires complets, numéro compris (écritures reçues par le
+        # serveur d'API). Les tickets existants sont remplacés, les autres ajoutés.
+        tickets = list(tickets)
+        if not tickets:
+            return
+        with self.lock:
+            positions = self.positions_of(ticket["N°"] for ticket in tickets)
+            changes = self._update_rows([ticket for ticket in tickets if ticket["N°"] in positions])
+            changes += self._insert_rows([ticket for ticket in tickets if ticket["N°"] not in positions])
+            self.write_changes(upserts=tickets)
+        self._notify_changes(changes)
+
+    def delete_tickets(self, ticket_numbers):
+        ticket_numbers = list(ticket_numbers)
+        if not ticket_numbers:
+            return
+        with self.lock:
+            changes = self._remove_rows(ticket_numbers)
+            self.write_changes(deletes=ticket_numbers)
+        self._notify_changes(changes)
+
+    # -- Modifications du DataFrame en mémoire (sans écriture sur disque) --
+    # Chaque méthode renvoie la liste des notifications (arguments de notify) à envoyer.
+
+    def _insert_rows(self, tickets):
+        import pandas as pd
+        if not tickets:
+            return []
+        start = len(self.df)
+        new_rows = self._conform(tickets)
+        new_rows.index = pd.Index(new_rows["N°"].to_numpy())
+        self.df = pd.concat([self.df, new_rows])
+        self.version += 1
+        for ticket in tickets:
+            try:
+                self._max_number = max(self._max_number, int(ticket["N°"]))
+            except (TypeError, ValueError):
+                pass
+        for ticket in tickets:
+            for column, index in self.search_indexes.items():
+                index.add(ticket["N°"], ticket[column])
+        return [("inserted", ticket["N°"], start + i, None, ticket) for i, ticket in enumerate(tickets)]
+
+    def _insert_frame(self, frame):
+        # Ajoute un DataFrame de tickets (page d'archives) sans construire un dictionnaire
+        # par ticket ; renvoie None (notification "reset") au-delà de RESET_THRESHOLD
+        import pandas as pd
+        frame = frame[~frame["N°"].isin(self.df.index)]
+        if frame.empty:
+            return []
+        start = len(self.df)
+        new_rows = self._conform(frame)
+        new_rows.index = pd.Index(new_rows["N°"].to_numpy())
+        self.df = pd.concat([self.df, new_rows])
+        self.version += 1
+        numbers = new_rows["N°"]
+        if numbers.notna().any():
+            self._max_number = max(self._max_number, int(numbers.max()))
+        for column, index in self.search_indexes.items():
+            for number, text in zip(numbers, new_rows[column].to_numpy(dtype=object, na_value=None)):
+                index.add(number, text)
+        if len(new_rows) > RESET_THRESHOLD:
+            return None
+        return [
+            ("inserted", self.df["N°"].iat[position], position, None, self.ticket_at(position))
+            for position in range(start, len(self.df))
+        ]
+
+    def _update_rows(self, tickets):
+        if not tickets:
+            return []
+        positions = self.positions_of(ticket["N°"] for ticket in tickets)
+        tickets = [ticket for ticket in tickets if ticket["N°"] in positions]
+        rows = [positions[ticket["N°"]] for ticket in tickets]
+        old_tickets = [self.ticket_at(position) for position in rows]
+        # Une affectation par colonne pour l'ensemble des lignes
+        for col in self.columns[1:]:
+            values = [ticket[col] for ticket in tickets]
+            if col in self.schema.category_columns:
+                values = self._category_values(values)
+                self._add_categories(col, values)
+            self.df.iloc[rows, self.df.columns.get_loc(col)] = values
+        self.version += 1
+        for ticket in tickets:
+            for column, index in self.search_indexes.items():
+                index.update(ticket["N°"], ticket[column])
+        return [
+            ("updated", ticket["N°"], position, old_ticket, ticket)
+            for ticket, position, old_ticket in zip(tickets, rows, old_tickets)
+        ]
+
+    def _remove_rows(self, ticket_numbers):
+        if not ticket_numbers:
+            return []
+        # Toutes les lignes du numéro sont retirées (numéro en double compris), comme
+        # dans le fichier (voir apply_changes)
+        mask = self.df["N°"].isin(list(ticket_numbers)).to_numpy()
+        rows = mask.nonzero()[0]
+        removed = [(int(position), self.ticket_at(position)) for position in rows]
+        self.df = self.df[~mask]
+        self.version += 1
+        for ticket_number in ticket_numbers:
+            for index in self.search_indexes.values():
+                index.remove(ticket_number)
+        # Ordre décroissant : chaque position reste valable au moment de sa notification
+        return [
+            ("removed", old_ticket["N°"], position, old_ticket, None)
+            for position, old_ticket in reversed(removed)
+        ]
+
+    def _notify_changes(self, changes):
+        if changes is None or len(changes) > RESET_THRESHOLD:
+            self.notify("reset")
+            return
+        for change in changes:
+            self.notify(*change)
+
+    def _same_ticket(self, ticket, other):
+        return all(self._cell_text(ticket.get(col)) == self._cell_text(other.get(col)) for col in self.columns[1:])
+
+    @staticmethod
+    def _cell_text(value):
+        import pandas as pd
+        if value is None or pd.isna(value):
+            return ""
+        return str(value)
+
+    def _diff_with(self, disk_df, pending):
+        # Compare le fichier relu au DataFrame en mémoire ; renvoie les tickets
+        # ajoutés et modifiés (dictionnaires) et les numéros supprimés sur disque.
+        # Numéro en double (classeur d'avant l'attribution sous verrou) : seule la
+        # dernière ligne est comparée, comme pour les recherches (voir positions_of)
+        memory = self.df.drop_duplicates("N°", keep="last").set_index("N°", drop=False)
+        disk = disk_df.drop_duplicates("N°", keep="last").set_index("N°", drop=False)
+        removed = [n for n in memory.index.difference(disk.index) if n not in pending]
+        added = [n for n in disk.index.difference(memory.index) if n not in pending]
+        common = memory.index.intersection(disk.index)
+        values = self.columns[1:]
+        memory_text = memory.loc[common, values].astype("string").fillna("")
+        disk_text = disk.loc[common, values].astype("string").fillna("")
+        differs = (memory_text != disk_text).any(axis=1).to_numpy()
+        changed = [n for n in common[differs] if n not in pending]
+        records = disk[self.columns]
+        inserted = [self._record(records.loc[n]) for n in added]
+        updated = [self._record(records.loc[n]) for n in changed]
+        return inserted, updated, removed
+
+    @staticmethod
+    def _record(row):
+        import pandas as pd
+        return {col: None if pd.isna(value) else value for col, value in row.items()}
 
-    def update_ticket(self, ticket_number, nom, programme, description, statut, priorite):
-        idx = self.df.index[self.df["N°"] == ticket_number]
-        if not idx.empty:
-            self.df.loc[idx, "Nom"] = nom
-            self.df.loc[idx, "Programme"] = programme
-            self.df.loc[idx, "Description"] = description
-            self.df.loc[idx, "Statut"] = statut
-            self.df.loc[idx, "Priorité"] = priorite
-            self.save_tickets()
\ No newline at end of file
+    def _replace_with(self, disk_df, pending):
+        # Remplace le DataFrame par le contenu du fichier, en gardant les tickets
+        # modifiés localement et pas encore enregistrés
+        import pandas as pd
+        if pending:
+            local = self.df[self.df["N°"].isin(list(pending))]
+            disk_df = pd.concat([disk_df[~disk_df["N°"].isin(list(pending))], local], ignore_index=True)
+        self.version += 1
+        self.rebuild_indexes(disk_df)
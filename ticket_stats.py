@@ -0,0 +1,70 @@
+from collections import Counter
+
+# Colonnes croisées par les statistiques
+STAT_COLUMNS = ("Programme", "Statut", "Priorité")
+
+
+# Nombre de tickets par (Programme, Statut, Priorité), tenu à jour à partir des
+# notifications du TicketService : un ajout, une modification ou une suppression ne
+# change que les compteurs de l'ancienne et de la nouvelle combinaison ; seul un
+# rechargement complet ("reset") recompte l'ensemble des tickets.
+class TicketStatistics:
+    def __init__(self, ticket_service):
+        self.ticket_service = ticket_service
+        # (programme, statut, priorité) -> nombre de tickets ; "" pour une cellule vide
+        self.counts = Counter()
+        # Fonctions appelées (sans argument) après chaque mise à jour des compteurs
+        self.listeners = []
+        if ticket_service.loaded:
+            self.recount()
+        ticket_service.subscribe(self.on_ticket_changed)
+
+    def close(self):
+        self.ticket_service.unsubscribe(self.on_ticket_changed)
+
+    def recount(self):
+        counts = Counter()
+        df = self.ticket_service.df
+        if len(df):
+            sizes = df.groupby(list(STAT_COLUMNS), observed=True, dropna=False).size()
+            for key, count in sizes.items():
+                if count:
+                    counts[self._key(key)] += int(count)
+        self.counts = counts
+
+    def on_ticket_changed(self, change):
+        if change.kind == "reset":
+            self.recount()
+        else:
+            if change.old is not None:
+                self._add(change.old, -1)
+            if change.new is not None:
+                self._add(change.new, 1)
+        for listener in list(self.listeners):
+            listener()
+
+    def count(self, programme=None, statut=None, priorite=None):
+        # Nombre de tickets ayant les valeurs données (None : toutes les valeurs)
+        wanted = (programme, statut, priorite)
+        return sum(
+            count for key, count in self.counts.items()
+            if all(value is None or value == found for value, found in zip(wanted, key))
+        )
+
+    def values(self, column, known=()):
+        # Valeurs d'une colonne : celles de config.json ("known"), puis celles
+        # rencontrées dans les tickets
+        index = STAT_COLUMNS.index(column)
+        found = {key[index] for key in self.counts}
+        return list(known) + sorted(found - set(known))
+
+    def _add(self, ticket, delta):
+        key = self._key(ticket.get(col) for col in STAT_COLUMNS)
+        self.counts[key] += delta
+        if self.counts[key] <= 0:
+            del self.counts[key]
+
+    @staticmethod
+    def _key(values):
+        import pandas as pd
+        return tuple("" if value is None or pd.isna(value) else str(value) for value in values)
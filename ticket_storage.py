@@ -0,0 +1,899 @@
+import os
+import json
+import getpass
+import sqlite3
+import tempfile
+import datetime
+import threading
+import urllib.error
+import urllib.request
+
+from concurrency import FileLock
+from snapshot_cache import SnapshotCache
+
+# Nombre de lignes lues entre deux notifications de progression
+CHUNK_ROWS = 2000
+
+
+# Stockage dans un classeur Excel : toute écriture réécrit le fichier complet.
+# Plusieurs postes pouvant ouvrir le même classeur, chaque écriture se fait sous
+# verrou et part de l'état du fichier : si un autre poste l'a modifié depuis notre
+# dernier accès, ses modifications sont relues et conservées (fusion).
+class ExcelStorage:
+    # write_changes() repart de l'état du fichier, pas du DataFrame en mémoire
+    writes_full_frame = False
+
+    def __init__(self, path, snapshot=None):
+        self.path = path
+        self.lock_path = path + ".lock"
+        # Instantané binaire optionnel, lu à la place du .xlsx s'il est à jour
+        self.snapshot = snapshot
+        self.loaded_from_snapshot = False
+        # Vrai lorsqu'une écriture a fusionné des modifications faites par un autre
+        # poste : le TicketService doit alors les relire (voir sync_from_disk)
+        self.external_changes = False
+        # Signature (date, taille) du fichier et contenu lors du dernier accès
+        self._known_signature = None
+        self._known_df = None
+        self._lock = threading.RLock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed_on_disk(self):
+        # Vrai si le fichier a été modifié par un autre programme depuis notre dernier accès
+        return self.signature() != self._known_signature
+
+    def load(self, columns, on_progress=None):
+        # on_progress(lignes lues, nombre total de lignes, aperçu) : voir read_excel_streaming()
+        with self._lock:
+            df = self._read(on_progress)
+            self.external_changes = False
+            # Copie de référence : le DataFrame renvoyé sera modifié par le TicketService
+            self._known_df = df.copy()
+            return df
+
+    def load_after(self, columns, after=None, limit=None):
+        # Tickets de numéro supérieur à "after" (None : tous), par numéro croissant,
+        # "limit" au plus ; ne modifie pas l'état connu du fichier. Le classeur n'étant
+        # pas trié par numéro, il est lu en entier (instantané s'il est à jour)
+        with self._lock:
+            signature = self.signature()
+            df = self.snapshot.load(signature) if self.snapshot is not None else None
+            if df is None:
+                df = read_excel_streaming(self.path)
+                if self.snapshot is not None:
+                    self.snapshot.save(signature, df)
+            return rows_after(df, after, limit)
+
+    def count(self):
+        # Nombre de lignes de tickets, d'après les dimensions enregistrées dans la feuille
+        from openpyxl import load_workbook
+        workbook = load_workbook(self.path, read_only=True)
+        try:
+            return max((workbook.worksheets[0].max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+
+    def save_all(self, df):
+        with self._lock, FileLock(self.lock_path):
+            self._write(df)
+
+    def create(self, df):
+        # Crée le fichier s'il n'existe toujours pas une fois le verrou obtenu ;
+        # renvoie False si un autre poste l'a créé entre-temps
+        with self._lock, FileLock(self.lock_path):
+            if self.exists():
+                return False
+            self._write(df)
+            return True
+
+    def write_changes(self, df, upserts, deletes):
+        # Le format .xlsx ne permet pas de n'écrire qu'une ligne : les modifications
+        # sont appliquées au dernier état connu du fichier, relu s'il a changé
+        with self._lock, FileLock(self.lock_path):
+            base = self._known_df
+            if base is None or self.changed_on_disk():
+                if self.exists():
+                    base = self._read()
+                    self.external_changes = self._known_df is not None
+                else:
+                    base = df
+            self._write(apply_changes(base, upserts, deletes))
+
+    def close(self):
+        pass
+
+    def _read(self, on_progress=None):
+        signature = self.signature()
+        self._known_signature = signature
+        if self.snapshot is not None:
+            df = self.snapshot.load(signature)
+            self.loaded_from_snapshot = df is not None
+            if df is not None:
+                return df
+        df = read_excel_streaming(self.path, on_progress)
+        if self.snapshot is not None:
+            self.snapshot.save(signature, df)
+        return df
+
+    def _write(self, df):
+        # Écriture dans un fichier temporaire puis remplacement atomique :
+        # le classeur n'est jamais laissé à moitié écrit
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".xlsx", dir=directory)
+        os.close(fd)
+        try:
+            df.to_excel(temp_path, index=False, engine='openpyxl')
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._known_signature = self.signature()
+        self._known_df = df
+        if self.snapshot is not None:
+            self.snapshot.save(self._known_signature, df)
+
+
+def read_excel_streaming(path, on_progress=None, chunk_size=CHUNK_ROWS, skip=0, limit=None):
+    # Lecture de la première feuille en flux (openpyxl en lecture seule, valeurs
+    # uniquement) : les valeurs sont accumulées directement colonne par colonne et le
+    # DataFrame n'est construit qu'une fois, à la fin. skip / limit : lignes de tickets
+    # ignorées au début, nombre maximal de lignes lues.
+    # Tous les "chunk_size" lignes, on_progress(lignes lues, total, aperçu) est appelée ;
+    # le total vaut 0 s'il est inconnu, l'aperçu est un DataFrame des premières lignes
+    # lors du premier appel, puis None.
+    import pandas as pd
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        total = max((sheet.max_row or 1) - 1 - skip, 0)
+        if limit is not None:
+            total = min(total, limit)
+        header = next(sheet.iter_rows(max_row=1, values_only=True), None)
+        if header is None:
+            return pd.DataFrame()
+        rows = sheet.iter_rows(min_row=2 + skip, max_row=None if limit is None else 1 + skip + limit, values_only=True)
+        names = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        values = [[] for _ in names]
+        count = 0
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            for column, value in zip(values, row):
+                column.append(value)
+            # Ligne plus courte que l'en-tête : cellules vides
+            for column in values[len(row):]:
+                column.append(None)
+            count += 1
+            if on_progress is not None and count % chunk_size == 0:
+                preview = None
+                if count == chunk_size:
+                    preview = pd.DataFrame({name: list(column) for name, column in zip(names, values)})
+                on_progress(count, max(total, count), preview)
+    finally:
+        workbook.close()
+    df = pd.DataFrame(dict(zip(names, values)))
+    if on_progress is not None and (count < chunk_size or count % chunk_size):
+        on_progress(count, count, df if count < chunk_size else None)
+    return df
+
+
+def rows_after(df, after=None, limit=None):
+    # Lignes de numéro supérieur à "after" (None : toutes), triées par numéro,
+    # "limit" au plus ; pagination par clé des archives (voir TicketService.load_archive_page)
+    import pandas as pd
+    numbers = pd.to_numeric(df["N°"], errors="coerce")
+    if after is not None:
+        df, numbers = df[numbers > after], numbers[numbers > after]
+    order = numbers.reset_index(drop=True).sort_values(kind="stable").index
+    df = df.iloc[order[:limit]]
+    return df.reset_index(drop=True)
+
+
+def apply_changes(df, upserts, deletes):
+    # Nouveau DataFrame : df sans les tickets supprimés ou remplacés, suivi des
+    # tickets ajoutés/modifiés (ceux déjà présents gardent leur place). Numéro en
+    # double : seule la dernière ligne est remplacée, les autres sont conservées.
+    import pandas as pd
+    if not upserts and not deletes:
+        return df
+    replaced = {ticket["N°"]: ticket for ticket in upserts}
+    numbers = df["N°"]
+    # Index positionnel : l'index du DataFrame du TicketService (N°) peut avoir des doublons
+    kept = df[~numbers.isin(list(deletes))].reset_index(drop=True)
+    # Colonnes "category" (DataFrame du TicketService) : repassées en objets pour
+    # accepter des valeurs hors catégories
+    for col in kept.select_dtypes("category").columns:
+        kept[col] = kept[col].astype(object)
+    in_place = kept["N°"].isin(list(replaced))
+    for idx in reversed(kept.index[in_place.to_numpy()]):
+        ticket = replaced.pop(kept.at[idx, "N°"], None)
+        if ticket is None:
+            continue
+        for col, value in ticket.items():
+            kept.at[idx, col] = value
+    if replaced:
+        kept = pd.concat([kept, pd.DataFrame(list(replaced.values()))], ignore_index=True)
+    return kept
+
+
+# Stockage dans une base SQLite locale (mode WAL) : une modification de ticket
+# correspond à l'écriture d'une seule ligne.
+class SQLiteStorage:
+    TABLE = "tickets"
+    writes_full_frame = False
+
+    def __init__(self, path, columns, table=TABLE):
+        self.path = path
+        self.columns = list(columns)
+        self.table = table
+        self._connection = None
+        # La connexion est partagée avec le thread d'enregistrement différé
+        self._lock = threading.RLock()
+        self._data_version = None
+        # Les écritures ligne à ligne ne touchent pas aux tickets des autres postes
+        self.external_changes = False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def changed_on_disk(self):
+        # data_version ne change que lorsqu'une autre connexion a modifié la base
+        with self._lock:
+            return self._data_version_now() != self._data_version
+
+    def _data_version_now(self):
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            columns_sql = ", ".join(
+                f'"{col}" INTEGER PRIMARY KEY' if col == "N°" else f'"{col}" TEXT'
+                for col in self.columns
+            )
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({columns_sql})")
+            self._connection.commit()
+        return self._connection
+
+    def create(self, df):
+        # La table est créée à la première connexion (CREATE TABLE IF NOT EXISTS)
+        with self._lock:
+            self.connection
+        return True
+
+    def load(self, columns, on_progress=None):
+        import pandas as pd
+        with self._lock:
+            self._data_version = self._data_version_now()
+            query = f'SELECT * FROM {self.table} ORDER BY "N°"'
+            if on_progress is None:
+                return pd.read_sql_query(query, self.connection)
+            # Lecture par blocs, avec la même progression que read_excel_streaming()
+            total = self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            chunks = []
+            count = 0
+            for chunk in pd.read_sql_query(query, self.connection, chunksize=CHUNK_ROWS):
+                chunks.append(chunk)
+                count += len(chunk)
+                on_progress(count, max(total, count), chunk if len(chunks) == 1 else None)
+            if not chunks:
+                on_progress(0, 0, None)
+                return pd.read_sql_query(query, self.connection)
+            return pd.concat(chunks, ignore_index=True)
+
+    def load_after(self, columns, after=None, limit=None):
+        import pandas as pd
+        with self._lock:
+            query = f'SELECT * FROM {self.table} WHERE "N°" > ? ORDER BY "N°" LIMIT ?'
+            after = float("-inf") if after is None else after
+            return pd.read_sql_query(query, self.connection, params=(after, -1 if limit is None else limit))
+
+    def count(self):
+        with self._lock:
+            return self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def save_all(self, df):
+        with self._lock, self.connection as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.executemany(self._upsert_sql(), (self._row_values(row) for row in df[self.columns].itertuples(index=False)))
+
+    def write_changes(self, df, upserts, deletes):
+        with self._lock, self.connection as conn:
+            if deletes:
+                conn.executemany(f'DELETE FROM {self.table} WHERE "N°" = ?', ((int(num),) for num in deletes))
+            if upserts:
+                conn.executemany(self._upsert_sql(), (self._row_values([ticket.get(col) for col in self.columns]) for ticket in upserts))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _upsert_sql(self):
+        columns_sql = ", ".join(f'"{col}"' for col in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        return f"INSERT OR REPLACE INTO {self.table} ({columns_sql}) VALUES ({placeholders})"
+
+    def _row_values(self, values):
+        return plain_values(self.columns, values)
+
+
+def plain_values(columns, values):
+    # Valeurs d'une ligne en types Python simples (numéro entier, texte ou None),
+    # pour SQLite et pour le JSON échangé avec le serveur d'API
+    import pandas as pd
+    row = []
+    for col, value in zip(columns, values):
+        if value is None or pd.isna(value):
+            row.append(None)
+        elif col == "N°":
+            row.append(int(value))
+        else:
+            row.append(str(value))
+    return row
+
+
+# Stockage distant : les tickets sont lus et écrits par l'intermédiaire du serveur
+# d'API (api_server.py), qui sérialise les écritures de tous les clients. Les
+# modifications des autres clients sont détectées grâce à l'ETag de la collection.
+class HttpStorage:
+    writes_full_frame = False
+    # Les écritures sont appliquées ticket par ticket par le serveur : rien à fusionner
+    external_changes = False
+
+    def __init__(self, url, columns, timeout=30):
+        self.url = url.rstrip("/")
+        self.path = self.url
+        self.columns = list(columns)
+        self.timeout = timeout
+        # ETag de la collection lors du dernier accès (lecture ou écriture de ce client)
+        self._etag = None
+        self._lock = threading.RLock()
+
+    def exists(self):
+        # Le serveur crée lui-même son stockage
+        return True
+
+    def changed_on_disk(self):
+        # Requête conditionnelle : 304 tant qu'aucun autre client n'a rien modifié
+        try:
+            status, headers, _ = self.request("GET", "/tickets?limit=0", headers={"If-None-Match": self._etag or ""})
+        except OSError as e:
+            print("Serveur d'API injoignable :", e)
+            return False
+        return status != 304
+
+    def load(self, columns, on_progress=None):
+        import pandas as pd
+        records = None
+        while records is None:
+            records = self._read_pages(on_progress)
+        return pd.DataFrame(records, columns=self.columns)
+
+    def _read_pages(self, on_progress):
+        # Lecture page par page, avec la même progression que read_excel_streaming() ;
+        # None si un autre client a modifié les tickets entre deux pages
+        import pandas as pd
+        records, etag = [], None
+        while True:
+            status, headers, data = self.request("GET", f"/tickets?offset={len(records)}&limit={CHUNK_ROWS}")
+            if etag is not None and headers.get("ETag") != etag:
+                return None
+            etag = headers.get("ETag")
+            first_page = not records
+            records.extend(data["tickets"])
+            if on_progress is not None:
+                preview = pd.DataFrame(data["tickets"], columns=self.columns) if first_page and records else None
+                on_progress(len(records), max(data["total"], len(records)), preview)
+            if len(records) >= data["total"] or not data["tickets"]:
+                with self._lock:
+                    self._etag = etag
+                return records
+
+    def count(self):
+        return self.request("GET", "/tickets?limit=0")[2]["total"]
+
+    def create(self, df):
+        return True
+
+    def allocate(self, count=1, floor=0):
+        # Numéros attribués par le serveur (qui connaît le plus grand numéro utilisé)
+        return self.request("POST", "/numbers", {"count": count})[2]["first"]
+
+    def save_all(self, df):
+        records = [self._record(row) for row in df[self.columns].itertuples(index=False)]
+        self._track(self.request("PUT", "/tickets", records))
+
+    def write_changes(self, df, upserts, deletes):
+        body = {
+            "upserts": [self._record([ticket.get(col) for col in self.columns]) for ticket in upserts],
+            "deletes": [int(number) for number in deletes]
+        }
+        self._track(self.request("POST", "/tickets/batch", body))
+
+    def close(self):
+        pass
+
+    def request(self, method, path, body=None, headers=None):
+        # Renvoie (statut, en-têtes, données JSON) ; les erreurs HTTP autres que 304
+        # sont levées sous forme d'OSError avec le message du serveur
+        data = None
+        headers = dict(headers or {})
+        if body is not None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                content = response.read()
+                return response.status, response.headers, json.loads(content) if content else None
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, e.headers, None
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise OSError(f"{method} {path} : {e.code} {message}") from None
+
+    def _record(self, values):
+        return dict(zip(self.columns, plain_values(self.columns, values)))
+
+    def _track(self, response):
+        # Après une écriture, l'ETag connu n'avance que si aucun autre client n'a écrit
+        # depuis le dernier accès : sinon changed_on_disk() doit signaler ses modifications
+        data = response[2]
+        with self._lock:
+            if data.get("previous_etag") == self._etag:
+                self._etag = data.get("etag")
+
+
+# Journal des modifications devant un classeur Excel : chaque ticket ajouté, modifié
+# ou supprimé est ajouté en fin de fichier JSON lines (une ligne par ticket, un seul
+# fsync par lot d'écriture), au lieu de réécrire le classeur. Au chargement, les
+# lignes du journal sont rejouées sur le classeur (ou son instantané).
+# Au-delà de "compact_entries" lignes, le journal est fusionné dans le classeur
+# en arrière-plan (compaction), puis ses lignes sont ajoutées à l'historique,
+# qui conserve toutes les modifications (qui, quand, quoi).
+#
+# Fichiers, à côté du classeur "x.xlsx" :
+#   x.journal.jsonl              lignes pas encore fusionnées dans le classeur
+#   x.journal.jsonl.compacting   lignes en cours de fusion (toujours rejouées)
+#   x.journal-history.jsonl      lignes déjà fusionnées (historique)
+class JournaledStorage:
+    writes_full_frame = False
+    # Une ligne de journal n'écrase jamais les modifications des autres postes
+    external_changes = False
+
+    def __init__(self, base, columns, compact_entries=500):
+        self.base = base
+        self.columns = list(columns)
+        self.path = base.path
+        self.compact_entries = compact_entries
+        root = os.path.splitext(base.path)[0]
+        self.journal_path = root + ".journal.jsonl"
+        self.compacting_path = self.journal_path + ".compacting"
+        self.history_path = root + ".journal-history.jsonl"
+        self.lock_path = self.journal_path + ".lock"
+        # Une seule compaction à la fois, tous postes confondus
+        self.compact_lock_path = self.journal_path + ".compact.lock"
+        self.user = _user_name()
+        # Nombre de lignes à rejouer (journal et compaction en cours) lors du dernier accès
+        self._entries = 0
+        # Signature des fichiers du journal lors du dernier accès
+        self._known_signature = None
+        self._compaction = None
+        self._lock = threading.RLock()
+
+    @property
+    def loaded_from_snapshot(self):
+        return getattr(self.base, "loaded_from_snapshot", False)
+
+    def exists(self):
+        return self.base.exists() or os.path.exists(self.journal_path) or os.path.exists(self.compacting_path)
+
+    def changed_on_disk(self):
+        with self._lock:
+            return self.base.changed_on_disk() or self._journal_signature() != self._known_signature
+
+    def load(self, columns, on_progress=None):
+        # Le classeur est lu avant le journal : s'il a été remplacé entre-temps par une
+        # compaction (d'un autre poste), les lignes fusionnées ont pu quitter le journal
+        # et la lecture est recommencée
+        for _ in range(5):
+            signature = self.base.signature()
+            df = self._base_frame(on_progress)
+            with self._lock, FileLock(self.lock_path):
+                if self.base.signature() != signature:
+                    continue
+                entries = self._read_entries()
+                self._known_signature = self._journal_signature()
+            self._entries = len(entries)
+            self._schedule_compaction()
+            return replay(df, entries)
+        raise TimeoutError(f"Classeur modifié pendant la lecture : {self.path}")
+
+    def load_after(self, columns, after=None, limit=None):
+        if not self._has_entries():
+            return self.base.load_after(columns, after, limit)
+        return rows_after(self.load(columns), after, limit)
+
+    def count(self):
+        if not self._has_entries():
+            return self.base.count()
+        return len(self.load(self.columns))
+
+    def create(self, df):
+        return self.base.create(df)
+
+    def write_changes(self, df, upserts, deletes):
+        now = datetime.datetime.now().isoformat(timespec="milliseconds")
+        lines = [
+            {"time": now, "user": self.user, "op": "upsert",
+             "ticket": dict(zip(self.columns, plain_values(self.columns, [ticket.get(col) for col in self.columns])))}
+            for ticket in upserts
+        ]
+        lines += [{"time": now, "user": self.user, "op": "delete", "N°": int(number)} for number in deletes]
+        if not lines:
+            return
+        data = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8")
+        with self._lock, FileLock(self.lock_path):
+            unchanged = self._journal_signature() == self._known_signature
+            _append(self.journal_path, data)
+            if unchanged:
+                # Sinon, un autre poste a écrit depuis le dernier accès : changed_on_disk()
+                # doit continuer à le signaler
+                self._known_signature = self._journal_signature()
+            self._entries += len(lines)
+        self._schedule_compaction()
+
+    def save_all(self, df):
+        # Enregistrement complet (import) : le classeur remplace tout le journal, dont
+        # les lignes passent dans l'historique
+        with FileLock(self.compact_lock_path), self._lock, FileLock(self.lock_path):
+            self.base.save_all(df)
+            for path in (self.compacting_path, self.journal_path):
+                self._move_to_history(path)
+            self._entries = 0
+            self._known_signature = self._journal_signature()
+
+    def compact(self):
+        # Fusionne le journal dans le classeur. Les écritures continuent pendant la
+        # fusion : le journal est d'abord renommé ("compacting"), puis effacé une fois
+        # le nouveau classeur écrit. Une compaction interrompue est reprise à la suivante.
+        # Renvoie False si un autre poste est déjà en train de compacter.
+        lock = FileLock(self.compact_lock_path, timeout=0)
+        try:
+            lock.acquire()
+        except TimeoutError:
+            return False
+        try:
+            self._compact()
+        finally:
+            lock.release()
+        return True
+
+    def _compact(self):
+        with self._lock, FileLock(self.lock_path):
+            unchanged = self._journal_signature() == self._known_signature
+            if os.path.exists(self.journal_path):
+                if os.path.exists(self.compacting_path):
+                    with open(self.journal_path, "rb") as f:
+                        _append(self.compacting_path, f.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.compacting_path)
+            if not os.path.exists(self.compacting_path):
+                return
+            entries = _read_journal(self.compacting_path)
+            if unchanged:
+                self._known_signature = self._journal_signature()
+        self.base.save_all(replay(self._base_frame(), entries))
+        with self._lock, FileLock(self.lock_path):
+            unchanged = self._journal_signature() == self._known_signature
+            self._move_to_history(self.compacting_path)
+            self._entries = max(self._entries - len(entries), 0)
+            if unchanged:
+                self._known_signature = self._journal_signature()
+
+    def history(self, ticket_number):
+        # Lignes du journal (déjà fusionnées ou non) concernant un ticket, de la plus ancienne
+        # à la plus récente
+        with self._lock, FileLock(self.lock_path):
+            entries = []
+            for path in (self.history_path, self.compacting_path, self.journal_path):
+                entries += _read_journal(path)
+        return [entry for entry in entries if _entry_number(entry) == ticket_number]
+
+    def close(self):
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        self.base.close()
+
+    # -- Outils internes --
+
+    def _base_frame(self, on_progress=None):
+        import pandas as pd
+        if self.base.exists():
+            return self.base.load(self.columns, on_progress)
+        return pd.DataFrame(columns=self.columns)
+
+    def _has_entries(self):
+        return os.path.exists(self.journal_path) or os.path.exists(self.compacting_path)
+
+    def _read_entries(self):
+        return _read_journal(self.compacting_path) + _read_journal(self.journal_path)
+
+    def _journal_signature(self):
+        signature = []
+        for path in (self.journal_path, self.compacting_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _move_to_history(self, path):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                _append(self.history_path, f.read())
+            os.remove(path)
+
+    def _schedule_compaction(self):
+        with self._lock:
+            if self._entries < self.compact_entries:
+                return
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            self._compaction = threading.Thread(target=self._run_compaction, name="journal-compaction", daemon=True)
+            self._compaction.start()
+
+    def _run_compaction(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print("Erreur lors de la compaction du journal :", e)
+
+
+def replay(df, entries):
+    # Applique les lignes du journal (dans l'ordre) : seule compte la dernière ligne de
+    # chaque ticket. Rejouer des lignes déjà fusionnées ne change rien.
+    final = {}
+    for entry in entries:
+        number = _entry_number(entry)
+        if number is not None:
+            final[number] = entry.get("ticket") if entry.get("op") == "upsert" else None
+    upserts = [ticket for ticket in final.values() if ticket is not None]
+    deletes = [number for number, ticket in final.items() if ticket is None]
+    return apply_changes(df, upserts, deletes).reset_index(drop=True)
+
+
+def _entry_number(entry):
+    return entry["ticket"].get("N°") if entry.get("op") == "upsert" else entry.get("N°")
+
+
+def _read_journal(path):
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Dernière ligne tronquée par un arrêt brutal pendant l'écriture
+                print("Ligne de journal illisible ignorée :", path)
+    return entries
+
+
+def _append(path, data):
+    # Ajout en fin de fichier suivi d'un fsync ; une ligne tronquée par un arrêt
+    # brutal est d'abord terminée, pour ne pas corrompre la suivante
+    with open(path, "ab") as f:
+        if f.tell() > 0:
+            with open(path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    f.write(b"\n")
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _user_name():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return ""
+
+
+# Stockage en deux partitions : tickets actifs et tickets archivés (statut
+# "archived_status", ex. "Fermé"). Seule la partition active est lue au chargement ;
+# les archives sont lues à la demande (load_archive). Un ticket change de partition
+# lorsqu'il est enregistré avec un autre statut.
+class PartitionedStorage:
+    writes_full_frame = False
+
+    def __init__(self, active, archive, archived_status):
+        self.active = active
+        self.archive = archive
+        self.archived_status = archived_status
+        self.path = active.path
+        # Numéros des tickets archivés présents en mémoire (lus dans les archives ou
+        # archivés depuis le chargement) : leurs modifications vont aux archives
+        self._archived = set()
+        # Nombre de tickets des archives, compté une fois puis tenu à jour par nos
+        # écritures (None : à compter) ; recompté après une relecture des tickets actifs,
+        # un autre poste ayant pu archiver des tickets
+        self._archive_count = None
+        self._lock = threading.RLock()
+
+    @property
+    def external_changes(self):
+        return self.active.external_changes
+
+    @property
+    def loaded_from_snapshot(self):
+        return getattr(self.active, "loaded_from_snapshot", False)
+
+    def exists(self):
+        return self.active.exists()
+
+    def changed_on_disk(self):
+        return self.active.changed_on_disk()
+
+    def is_archived(self, ticket):
+        return ticket.get("Statut") == self.archived_status
+
+    def archived_numbers(self):
+        with self._lock:
+            return set(self._archived)
+
+    def mark_archived(self, ticket_numbers):
+        with self._lock:
+            self._archived.update(ticket_numbers)
+
+    def load(self, columns, on_progress=None):
+        df = self.active.load(columns, on_progress)
+        with self._lock:
+            self._archived = set()
+            self._archive_count = None
+        archived = (df["Statut"] == self.archived_status).to_numpy() if "Statut" in df.columns else None
+        if archived is not None and archived.any():
+            # Tickets clos encore dans la partition active (classeur d'avant le
+            # partitionnement, poste utilisant une version antérieure) : déplacés
+            moved = df[archived]
+            self.archive.write_changes(df.iloc[0:0], moved.to_dict("records"), [])
+            self.active.write_changes(df, [], list(moved["N°"]))
+            df = df[~archived].reset_index(drop=True)
+        return df
+
+    def count_archive(self):
+        with self._lock:
+            if self._archive_count is None:
+                self._archive_count = self.archive.count() if self.archive.exists() else 0
+            return self._archive_count
+
+    def _count_archived(self, added, removed):
+        # Tickets ajoutés aux archives / retirés des archives par une écriture
+        with self._lock:
+            if self._archive_count is not None:
+                self._archive_count = max(self._archive_count + added - removed, 0)
+
+    def load_archive(self, columns, after=None, limit=None):
+        # Tickets archivés de numéro supérieur à "after", par numéro croissant
+        import pandas as pd
+        if not self.archive.exists():
+            return pd.DataFrame(columns=columns)
+        return self.archive.load_after(columns, after, limit)
+
+    def max_archived_number(self):
+        import pandas as pd
+        numbers = pd.to_numeric(self.load_archive(["N°"])["N°"], errors="coerce")
+        return int(numbers.max()) if numbers.notna().any() else 0
+
+    def save_all(self, df):
+        archived = (df["Statut"] == self.archived_status).to_numpy()
+        self.active.save_all(df[~archived])
+        if archived.any():
+            # Les archives non chargées en mémoire sont conservées
+            moved = df[archived]
+            self.archive.write_changes(df.iloc[0:0], moved.to_dict("records"), [])
+            self._count_archived(len(set(moved["N°"]) - self.archived_numbers()), 0)
+            self.mark_archived(moved["N°"])
+
+    def create(self, df):
+        return self.active.create(df)
+
+    def write_changes(self, df, upserts, deletes):
+        with self._lock:
+            archived = set(self._archived)
+        active_upserts, active_deletes = [], []
+        archive_upserts, archive_deletes = [], []
+        for ticket in upserts:
+            number = ticket["N°"]
+            if self.is_archived(ticket):
+                archive_upserts.append(ticket)
+                if number not in archived:
+                    # Ticket qui vient d'être clos : retiré de la partition active
+                    active_deletes.append(number)
+            else:
+                active_upserts.append(ticket)
+                if number in archived:
+                    # Ticket rouvert : retiré des archives
+                    archive_deletes.append(number)
+        for number in deletes:
+            (archive_deletes if number in archived else active_deletes).append(number)
+        if archive_upserts or archive_deletes:
+            # Archives absentes : créées à partir des seuls tickets archivés
+            self.archive.write_changes(df.iloc[0:0], archive_upserts, archive_deletes)
+        if active_upserts or active_deletes:
+            self.active.write_changes(df, active_upserts, active_deletes)
+        # Mis à jour après l'écriture : en cas d'échec, le nouvel essai refait les déplacements
+        with self._lock:
+            self._count_archived(
+                len({ticket["N°"] for ticket in archive_upserts} - archived), len(set(archive_deletes))
+            )
+            self._archived.update(ticket["N°"] for ticket in archive_upserts)
+            self._archived.difference_update(archive_deletes)
+            self._archived.difference_update(ticket["N°"] for ticket in active_upserts)
+
+    def close(self):
+        self.active.close()
+        self.archive.close()
+
+
+def create_storage(config, columns):
+    # Sélection du moteur de stockage via la clé "storage" de config.json ;
+    # "archive": true sépare les tickets archivés dans un classeur ou une table à part
+    storage = config.get("storage", "excel")
+    if storage == "excel":
+        excel_path = config.get("excel_path", "suivi_jira_dcgf.xlsx")
+        active = _excel_storage(excel_path, config, columns)
+        if not config.get("archive", False):
+            return active
+        archive_path = config.get("archive_path") or os.path.splitext(excel_path)[0] + "_archives.xlsx"
+        archive = _excel_storage(archive_path, config, columns)
+    elif storage == "sqlite":
+        sqlite_path = config.get("sqlite_path", "suivi_jira_dcgf.db")
+        active = SQLiteStorage(sqlite_path, columns)
+        if not config.get("archive", False):
+            return active
+        archive = SQLiteStorage(sqlite_path, columns, table="archives")
+    elif storage == "http":
+        # Archives éventuelles gérées par le serveur, qui renvoie tous les tickets
+        return HttpStorage(config.get("api_url", "http://127.0.0.1:8765"), columns, config.get("api_timeout", 30))
+    else:
+        raise ValueError(f"Moteur de stockage inconnu : {storage}")
+    return PartitionedStorage(active, archive, config.get("archive_status", "Fermé"))
+
+
+def _excel_storage(path, config, columns):
+    # "journal": true : les modifications sont ajoutées au journal du classeur
+    snapshot = None
+    if config.get("snapshot_cache", True):
+        snapshot = SnapshotCache(path, config.get("snapshot_dir"))
+    storage = ExcelStorage(path, snapshot)
+    if config.get("journal", False):
+        storage = JournaledStorage(storage, columns, config.get("journal_compact_entries", 500))
+    return storage
@@ -0,0 +1,210 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor
+
+
+# Modèle de table lisant directement les colonnes du DataFrame des tickets.
+# Aucune cellule n'est matérialisée : data() ne lit que les lignes visibles.
+class TicketTableModel(QAbstractTableModel):
+    def __init__(self, schema, parent=None):
+        super().__init__(parent)
+        self.columns = list(schema.names)
+        # Tableaux numpy des valeurs, un par colonne (même ordre que self.columns)
+        self._arrays = [np.empty(0, dtype=object) for _ in self.columns]
+        # Positions (dans le DataFrame) des lignes affichées, dans l'ordre d'affichage
+        self._rows = np.empty(0, dtype=np.int64)
+        self._sort_column = None
+        self._sort_order = Qt.AscendingOrder
+        self.set_schema(schema)
+
+    def set_schema(self, schema):
+        # Rendu précalculé par colonne (même ordre que self.columns) : brosses du
+        # rôle BackgroundRole par valeur (None sans code couleur) et alignement ;
+        # après un changement de schéma, la vue doit être redessinée
+        self._backgrounds = []
+        self._alignments = []
+        for col_name in self.columns:
+            column = schema.column(col_name)
+            colors = {value: QBrush(QColor(color)) for value, color in column.colors.items()}
+            self._backgrounds.append(colors or None)
+            self._alignments.append(Qt.AlignCenter if column.centered else None)
+
+    # -- Alimentation du modèle --
+
+    def set_dataframe(self, df):
+        # Récupère les colonnes du DataFrame sous forme de tableaux (pas de copie ligne à ligne)
+        self.beginResetModel()
+        self._arrays = self._column_arrays(df)
+        self._rows = np.arange(len(df), dtype=np.int64)
+        self._apply_sort()
+        self.endResetModel()
+
+    def set_rows(self, positions):
+        # Restreint l'affichage aux positions données (résultat d'un filtrage)
+        self.beginResetModel()
+        self._rows = np.asarray(positions, dtype=np.int64)
+        self._apply_sort()
+        self.endResetModel()
+
+    def patch_arrays(self, df, kind, position):
+        # Reporte dans les tableaux de colonnes une ligne ajoutée ("inserted"), modifiée
+        # ("updated") ou supprimée ("removed") du DataFrame, sans relire les autres lignes
+        # ni réinitialiser la vue (les positions affichées restent valides)
+        size = len(self._arrays[0])
+        if position > size or (kind != "inserted" and position == size):
+            # Tableaux pas à jour (modèle pas encore alimenté) : relecture complète
+            self._arrays = self._column_arrays(df)
+            return
+        if kind == "removed":
+            self._arrays = [np.delete(array, position) for array in self._arrays]
+            return
+        values = self._column_arrays(df.iloc[position:position + 1])
+        arrays = []
+        for array, value in zip(self._arrays, values):
+            if array.dtype != value.dtype and array.dtype != object:
+                # Ex. N° entier devenant vide : le tableau passe en objets
+                array = array.astype(object)
+            if kind == "inserted":
+                array = np.insert(array, position, value)
+            else:
+                if not array.flags.writeable:
+                    array = array.copy()
+                array[position] = value[0]
+            arrays.append(array)
+        self._arrays = arrays
+
+    def row_of_position(self, position):
+        rows = np.flatnonzero(self._rows == position)
+        return int(rows[0]) if len(rows) else None
+
+    def insert_position(self, position):
+        # Affiche une nouvelle ligne, à sa place selon le tri courant
+        row = self._insertion_row(position)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows = np.insert(self._rows, row, position)
+        self.endInsertRows()
+
+    def update_position(self, position):
+        row = self.row_of_position(position)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+        return row
+
+    def remove_position(self, position):
+        # Retire la ligne (si elle est affichée) et décale les positions suivantes,
+        # la ligne ayant été supprimée du DataFrame
+        row = self.row_of_position(position)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._rows = np.delete(self._rows, row)
+            self.endRemoveRows()
+        self._rows[self._rows > position] -= 1
+
+    def hide_position(self, position):
+        # Retire la ligne de l'affichage sans modifier les positions
+        row = self.row_of_position(position)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._rows = np.delete(self._rows, row)
+            self.endRemoveRows()
+
+    def ticket_number(self, row):
+        # Renvoie la valeur brute de la colonne "N°" pour une ligne affichée
+        return self._arrays[self.columns.index("N°")][self._rows[row]]
+
+    def display_text(self, row, col):
+        # Texte affiché dans une cellule (utilisé pour le calcul des hauteurs de ligne)
+        return self._display_text(self._arrays[col][self._rows[row]])
+
+    # -- Interface QAbstractTableModel --
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+        if role == Qt.DisplayRole:
+            return self._display_text(self._arrays[col][self._rows[index.row()]])
+        if role == Qt.BackgroundRole:
+            colors = self._backgrounds[col]
+            if colors:
+                text = self._display_text(self._arrays[col][self._rows[index.row()]])
+                return colors.get(text)
+            return None
+        if role == Qt.TextAlignmentRole:
+            return self._alignments[col]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._sort_column = column
+        self._sort_order = order
+        self._apply_sort()
+        self.layoutChanged.emit()
+
+    # -- Outils internes --
+
+    def _column_arrays(self, df):
+        # Colonnes typées (Int64, category, string) : les valeurs manquantes
+        # deviennent None ; sans valeur manquante, N° reste un tableau d'entiers
+        arrays = []
+        for col_name in self.columns:
+            series = df[col_name]
+            if series.hasnans:
+                arrays.append(series.to_numpy(dtype=object, na_value=None))
+            else:
+                arrays.append(series.to_numpy())
+        return arrays
+
+    @staticmethod
+    def _display_text(value):
+        if value is None or (isinstance(value, float) and value != value):
+            return ""
+        return str(value).rstrip()
+
+    def _apply_sort(self):
+        if self._sort_column is None or len(self._rows) == 0:
+            return
+        keys = self._arrays[self._sort_column][self._rows]
+        try:
+            order = np.argsort(keys, kind="stable")
+        except TypeError:
+            # Valeurs hétérogènes (texte et nombres, cellules vides) : tri sur le texte
+            order = np.argsort(self._text_keys(keys), kind="stable")
+        if self._sort_order == Qt.DescendingOrder:
+            order = order[::-1]
+        self._rows = self._rows[order]
+
+    def _text_keys(self, keys):
+        return np.array([self._display_text(k) for k in keys])
+
+    def _insertion_row(self, position):
+        if self._sort_column is None or len(self._rows) == 0:
+            return len(self._rows)
+        column = self._arrays[self._sort_column]
+        keys = column[self._rows]
+        key = column[position]
+        descending = self._sort_order == Qt.DescendingOrder
+        if descending:
+            keys = keys[::-1]
+        try:
+            index = int(np.searchsorted(keys, key, side="right"))
+        except TypeError:
+            index = int(np.searchsorted(self._text_keys(keys), self._display_text(key), side="right"))
+        return len(self._rows) - index if descending else index
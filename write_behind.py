@@ -0,0 +1,160 @@
+import threading
+import time
+
+
+# Enregistrement différé des tickets.
+# Les modifications sont appliquées immédiatement au DataFrame par le TicketService,
+# puis accumulées ici ; un thread d'arrière-plan les regroupe et les écrit sur disque
+# après "interval" secondes d'inactivité, ou lors de flush()/close().
+# coalesce=False (journal des modifications) : chaque modification est écrite telle
+# quelle, dans l'ordre, au lieu de ne garder que le dernier état de chaque ticket.
+class WriteBehindWriter:
+    SAVED = "saved"
+    PENDING = "pending"
+    SAVING = "saving"
+    ERROR = "error"
+
+    def __init__(self, ticket_service, interval=2.0, coalesce=True):
+        self.ticket_service = ticket_service
+        self.interval = interval
+        self.coalesce = coalesce
+        self.last_error = None
+        self._condition = threading.Condition()
+        # Modifications en attente, dans l'ordre : liste de (upserts, deletes)
+        self._batches = []
+        self._full_save = False
+        # Numéros des tickets en cours d'écriture
+        self._in_flight = set()
+        self._saving = False
+        self._failed = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    @property
+    def state(self):
+        with self._condition:
+            if self._saving:
+                return self.SAVING
+            if self._has_pending():
+                return self.ERROR if self._failed else self.PENDING
+            return self.SAVED
+
+    def enqueue(self, upserts=(), deletes=()):
+        upserts, deletes = list(upserts), list(deletes)
+        if not upserts and not deletes:
+            return
+        with self._condition:
+            self._batches.append((upserts, deletes))
+            self._condition.notify_all()
+
+    def pending_numbers(self):
+        # Numéros des tickets modifiés localement et pas encore écrits sur disque
+        with self._condition:
+            numbers = set(self._in_flight)
+            for upserts, deletes in self._batches:
+                numbers.update(ticket["N°"] for ticket in upserts)
+                numbers.update(deletes)
+            return numbers
+
+    def enqueue_full_save(self):
+        with self._condition:
+            self._full_save = True
+            self._condition.notify_all()
+
+    def flush(self):
+        # Écrit immédiatement les modifications en attente et attend la fin de l'écriture
+        self._write_pending()
+
+    def close(self):
+        if self._closed:
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        # Garantit qu'aucune modification n'est perdue à la fermeture
+        self.flush()
+
+    # -- Thread d'écriture --
+
+    def _has_pending(self):
+        return bool(self._batches or self._full_save)
+
+    @staticmethod
+    def _merge(batches):
+        # Regroupe les modifications en une seule écriture (la dernière l'emporte)
+        merged_upserts, merged_deletes = {}, set()
+        for upserts, deletes in batches:
+            for ticket in upserts:
+                merged_deletes.discard(ticket["N°"])
+                merged_upserts[ticket["N°"]] = ticket
+            for ticket_number in deletes:
+                merged_upserts.pop(ticket_number, None)
+                merged_deletes.add(ticket_number)
+        return [(list(merged_upserts.values()), list(merged_deletes))]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._has_pending() and not self._closed:
+                    self._condition.wait()
+                # Laisse les modifications rapprochées s'accumuler avant d'écrire
+                deadline = time.monotonic() + self.interval
+                while not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return
+            self._write_pending()
+            if self._failed:
+                # Nouvel essai après une pause, sans boucler en continu sur l'erreur
+                with self._condition:
+                    self._condition.wait(self.interval)
+
+    def _write_pending(self):
+        service = self.ticket_service
+        # Prise d'un instantané cohérent : DataFrame et modifications en attente ensemble
+        with service.lock:
+            with self._condition:
+                # Une seule écriture à la fois (thread d'écriture ou flush())
+                while self._saving:
+                    self._condition.wait()
+                if not self._has_pending():
+                    return
+                full_save = self._full_save
+                # L'enregistrement complet contient déjà toutes les modifications en attente
+                batches = [] if full_save else self._batches
+                if self.coalesce and len(batches) > 1:
+                    batches = self._merge(batches)
+                self._in_flight = self.pending_numbers()
+                self._batches = []
+                self._full_save = False
+                self._saving = True
+            df = service.df.copy() if full_save or service.storage.writes_full_frame else service.df
+
+        error = None
+        try:
+            if full_save:
+                service.storage.save_all(df)
+            while batches:
+                upserts, deletes = batches[0]
+                service.storage.write_changes(df, upserts, deletes)
+                batches.pop(0)
+        except Exception as e:
+            error = e
+            print("Erreur lors de la sauvegarde du fichier :", e)
+
+        with self._condition:
+            self._saving = False
+            self._in_flight = set()
+            self._failed = error is not None
+            self.last_error = error
+            if error is not None:
+                # Remet les modifications non écrites en attente, avant celles arrivées
+                # entre-temps (qui l'emportent donc toujours)
+                self._full_save = self._full_save or full_save
+                self._batches = batches + self._batches
+            self._condition.notify_all()